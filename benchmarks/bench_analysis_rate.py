@@ -0,0 +1,93 @@
+"""Compare silence detection at the native rate with downsampled mono analysis.
+
+For every input the script times detect_silence_in_file at the native rate
+and at each analysis rate, and the ffmpeg decode alone at that rate, then
+reports the number of cuts and how far the cut boundaries moved relative to
+the native-rate result. A speedup below 1 is a slowdown.
+
+Downsampling is not a speedup in practice: the compressed audio is decoded
+at full rate either way and the resampler costs about what the smaller
+windows save (0.78-0.98x on the bundled MP3 clips and a 15-minute MP3),
+while the band above analysis_fps / 2 no longer counts towards the levels,
+so the same threshold cuts more (716 -> 940 sections at 8 kHz) and some
+boundaries move by hundreds of milliseconds.
+
+    python benchmarks/bench_analysis_rate.py --rates 16000 8000
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_editor.audio import DEFAULT_FPS, iter_pcm_blocks
+from video_editor.detection import detect_silence_in_file
+
+
+def boundaries(intervals):
+    return np.array([t for interval in intervals for t in interval])
+
+
+def boundary_shift(reference, candidate):
+    """Distance in seconds from each reference boundary to the nearest candidate boundary."""
+    if not len(reference) or not len(candidate):
+        return np.array([np.inf])
+    candidate = np.sort(candidate)
+    index = np.clip(np.searchsorted(candidate, reference), 1, len(candidate) - 1)
+    return np.minimum(np.abs(reference - candidate[index - 1]), np.abs(reference - candidate[index]))
+
+
+def timed_detection(filename, args, analysis_fps):
+    started = time.perf_counter()
+    intervals, duration = detect_silence_in_file(filename, args.threshold, args.chunk_size,
+                                                 fps=DEFAULT_FPS, analysis_fps=analysis_fps)
+    return intervals, duration, time.perf_counter() - started
+
+
+def timed_decode(filename, fps):
+    started = time.perf_counter()
+    for _ in iter_pcm_blocks(filename, fps=fps):
+        pass
+    return time.perf_counter() - started
+
+
+def main():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', default=sorted(glob.glob(os.path.join(root, 'threshold_*.mp4'))))
+    parser.add_argument('--rates', type=int, nargs='+', default=[16000, 8000])
+    parser.add_argument('--threshold', type=float, default=0.005)
+    parser.add_argument('--chunk-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3, help="best of N timings")
+    args = parser.parse_args()
+
+    print(f"{'file':40} {'rate':>6} {'time s':>8} {'decode s':>8} {'speedup':>8} {'cuts':>6} "
+          f"{'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    slower = []
+    for filename in args.files:
+        runs = [timed_detection(filename, args, None) for _ in range(args.repeat)]
+        native, duration, native_time = min(runs, key=lambda run: run[2])
+        decode = min(timed_decode(filename, DEFAULT_FPS) for _ in range(args.repeat))
+        name = os.path.basename(filename)
+        print(f"{name:40} {DEFAULT_FPS:>6} {native_time:>8.3f} {decode:>8.3f} {1.0:>8.2f} {len(native):>6}")
+
+        for rate in args.rates:
+            runs = [timed_detection(filename, args, rate) for _ in range(args.repeat)]
+            intervals, _, elapsed = min(runs, key=lambda run: run[2])
+            decode = min(timed_decode(filename, rate) for _ in range(args.repeat))
+            shift = boundary_shift(boundaries(native), boundaries(intervals)) * 1000
+            print(f"{'':40} {rate:>6} {elapsed:>8.3f} {decode:>8.3f} {native_time / elapsed:>8.2f} "
+                  f"{len(intervals):>6} {np.median(shift):>10.2f} {np.percentile(shift, 95):>8.2f} "
+                  f"{shift.max():>8.2f}")
+            if elapsed >= native_time:
+                slower.append(f"{name} at {rate} Hz")
+    if slower:
+        print(f"\nSlower than the native rate: {', '.join(slower)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Guard the package's import time and the CLI's startup cost.
+
+Times `import video_editor` and `video-editor --help` in fresh interpreters,
+subtracting bare interpreter startup, and checks that neither loads the
+heavy media stack. Exits non-zero when a budget is exceeded.
+
+    python benchmarks/bench_import.py --budget-ms 150
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('numpy', 'moviepy', 'imageio', 'imageio_ffmpeg', 'PIL', 'tqdm', 'proglog')
+
+CHECK_MODULES = f"""
+import sys
+from video_editor.cli import build_parser
+build_parser()
+import video_editor
+print(__import__('json').dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))
+"""
+
+
+def best_time(args, repeat):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(args, check=True, env=env, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help="best of N runs")
+    parser.add_argument('--budget-ms', type=float, default=150.0,
+                        help="allowed cost on top of bare interpreter startup")
+    args = parser.parse_args()
+
+    baseline = best_time([sys.executable, '-c', 'pass'], args.repeat)
+    results = {
+        'import video_editor': best_time([sys.executable, '-c', 'import video_editor'], args.repeat) - baseline,
+        'video-editor --help': best_time([sys.executable, '-m', 'video_editor', '--help'], args.repeat) - baseline,
+    }
+
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    loaded = json.loads(subprocess.run([sys.executable, '-c', CHECK_MODULES], check=True, env=env,
+                                       capture_output=True, text=True).stdout)
+
+    failed = bool(loaded)
+    print(f"interpreter startup: {baseline:.1f} ms")
+    for name, cost in results.items():
+        status = 'ok' if cost <= args.budget_ms else 'OVER BUDGET'
+        failed |= cost > args.budget_ms
+        print(f"{name:24} +{cost:7.1f} ms  {status}")
+    print(f"heavy modules loaded at startup: {', '.join(loaded) or 'none'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Time detection, interval processing and MLT generation on synthetic recordings of known content.
+
+Fixtures are mono 16-bit WAV files of alternating voiced segments (speech-like
+harmonics with a syllable envelope, steady tones, noise bursts) and gaps of
+low-level noise, generated from a seed at 1 minute, 1 hour or 8 hours. The
+voiced segments are written next to each fixture as its ground truth.
+
+Every (fixture, engine) case runs in a fresh interpreter so peak memory is
+its own. The report gives the throughput of every stage in x-realtime and
+checks the cuts against the ground truth; the script exits non-zero when
+they do not match, so a speed-up cannot silently change results.
+
+    python benchmarks/bench_suite.py --sizes 1m 1h --json bench.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SIZES = {'1m': 60, '1h': 3600, '8h': 8 * 3600}
+RATE = 16000
+THRESHOLD = 0.01
+# Release holds voice after it drops, so hysteresis ends come that much later than the truth
+ENGINE_OPTIONS = {'threshold': {}, 'hysteresis': {'attack': 0.05, 'release': 0.1}}
+NOISE_FLOOR = 0.001  # standard deviation of the gaps, far below THRESHOLD
+BLOCK_SECONDS = 60
+
+
+def voiced_signal(kind, length, rng, table):
+    """One voiced segment of ``length`` samples as float32 in [-1, 1]."""
+    if kind == 'tone':
+        return (0.3 * np.sin(2 * np.pi * rng.uniform(200, 1000) / RATE * np.arange(length))).astype(np.float32)
+    if kind == 'noise':
+        return (rng.standard_normal(length, dtype=np.float32) * 0.2).clip(-1, 1)
+    # Speech-like: a one-second harmonic table read from a random offset, with syllables every 120-300 ms
+    offset = rng.integers(RATE)
+    signal = np.take(table, np.arange(offset, offset + length) % RATE)
+    knots = np.arange(0, length + RATE // 4, RATE // 5)
+    envelope = np.interp(np.arange(length), knots, rng.uniform(0.4, 1.0, len(knots))).astype(np.float32)
+    return signal * envelope + rng.standard_normal(length, dtype=np.float32) * 0.05
+
+
+def generate_fixture(path, seconds, seed=0):
+    """Write a WAV fixture and its ground truth (voiced [start, end) sample pairs) to path + '.json'."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(RATE) / RATE
+    table = sum(np.sin(2 * np.pi * 120 * k * t + rng.uniform(0, 2 * np.pi)) / k for k in range(1, 9))
+    table = (0.3 * table / np.abs(table).max()).astype(np.float32)
+
+    total = seconds * RATE
+    segments = []
+    position = int(rng.uniform(0.5, 2.0) * RATE)
+    while True:
+        length = int(rng.uniform(0.5, 8.0) * RATE)
+        if position + length + RATE // 2 > total:
+            break
+        segments.append((position, position + length))
+        position += length + int(rng.uniform(0.4, 3.0) * RATE)
+
+    kinds = rng.choice(['speech', 'tone', 'noise'], size=len(segments), p=[0.7, 0.15, 0.15])
+    partial = path + '.partial'
+    with wave.open(partial, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        index = 0
+        current = None  # (index, samples) of the segment being written, which may cross blocks
+        # Written a block at a time so an 8 hour fixture never sits in memory
+        for block_start in range(0, total, BLOCK_SECONDS * RATE):
+            block_end = min(block_start + BLOCK_SECONDS * RATE, total)
+            block = rng.standard_normal(block_end - block_start, dtype=np.float32) * NOISE_FLOOR
+            while index < len(segments) and segments[index][0] < block_end:
+                start, end = segments[index]
+                if current is None or current[0] != index:
+                    current = (index, voiced_signal(kinds[index], end - start, rng, table))
+                lo, hi = max(start, block_start), min(end, block_end)
+                block[lo - block_start:hi - block_start] = current[1][lo - start:hi - start]
+                if end > block_end:
+                    break
+                index += 1
+            out.writeframes((block.clip(-1, 1) * 32767).astype('<i2').tobytes())
+    os.replace(partial, path)
+    with open(path + '.json', 'w') as f:
+        json.dump({'rate': RATE, 'seconds': seconds, 'seed': seed, 'segments': segments}, f)
+
+
+def fixture_path(fixture_dir, size, seed):
+    path = os.path.join(fixture_dir, f'synthetic_{size}_seed{seed}.wav')
+    if not (os.path.exists(path) and os.path.exists(path + '.json')):
+        started = time.perf_counter()
+        generate_fixture(path, SIZES[size], seed)
+        print(f"generated {os.path.basename(path)} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def run_case(path, engine):
+    """Child process: run one engine on one fixture and print its measurements as JSON."""
+    from video_editor.mlt import write_mlt
+    from video_editor.pipeline import detect_voiced_frames
+    from video_editor.profiling import Profiler, peak_rss
+    from video_editor.timecode import DEFAULT_PROFILE, frames_to_seconds, profile_frame_rate
+
+    profiler = Profiler()
+    with profiler:
+        voiced, length, _ = detect_voiced_frames(path, THRESHOLD, analysis_fps=RATE, engine=engine,
+                                                 engine_options=ENGINE_OPTIONS[engine], profiler=profiler)
+        with tempfile.TemporaryDirectory() as tmp:
+            with profiler.stage('mlt_write'):
+                write_mlt(os.path.join(tmp, 'bench.mlt'), path, list(voiced), length, DEFAULT_PROFILE)
+    stages = {name: seconds for name, (seconds, _) in profiler.stages.items()}
+    frame_rate = profile_frame_rate(DEFAULT_PROFILE)
+    print(json.dumps({'stages': stages, 'wall_seconds': profiler.wall_seconds,
+                      'peak_rss_bytes': peak_rss('self'), 'peak_children_rss_bytes': peak_rss('children'),
+                      'sections': voiced.to_seconds(frame_rate),
+                      'audio_seconds': float(frames_to_seconds(length, frame_rate))}))
+
+
+def check_ground_truth(sections, truth, engine):
+    """Worst boundary error in seconds, or None when the number of sections differs."""
+    rate = truth['rate']
+    expected = np.array(truth['segments'], dtype=np.float64).reshape(-1, 2) / rate
+    expected[:, 1] += ENGINE_OPTIONS[engine].get('release', 0.0)
+    found = np.array(sections, dtype=np.float64).reshape(-1, 2)
+    if len(found) != len(expected):
+        return None
+    return float(np.abs(found - expected).max()) if len(found) else 0.0
+
+
+def main():
+    from video_editor.detection import DETECTORS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', choices=sorted(SIZES), default=['1m', '1h'])
+    parser.add_argument('--engines', nargs='+', choices=sorted(DETECTORS), default=sorted(DETECTORS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fixture-dir', default=os.path.join(tempfile.gettempdir(), 'video_editor_bench'),
+                        help="where fixtures are generated once and reused")
+    parser.add_argument('--tolerance', type=float, default=0.03,
+                        help="allowed boundary error in seconds (frame snapping is up to half a frame)")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--case', nargs=2, metavar=('FIXTURE', 'ENGINE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(*args.case)
+        return
+
+    os.makedirs(args.fixture_dir, exist_ok=True)
+    fixtures = {size: fixture_path(args.fixture_dir, size, args.seed) for size in args.sizes}
+    results = []
+    failed = False
+    print(f"{'size':>4} {'engine':>10} {'detect x':>10} {'intervals x':>12} {'mlt x':>10} {'wall s':>8} "
+          f"{'peak MB':>8} {'ffmpeg MB':>9} {'sections':>8} {'max err ms':>10}")
+    for size in args.sizes:
+        path = fixtures[size]
+        with open(path + '.json') as f:
+            truth = json.load(f)
+        for engine in args.engines:
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--case', path, engine],
+                                  check=True, capture_output=True, text=True)
+            case = json.loads(proc.stdout)
+            stages, audio = case['stages'], case['audio_seconds']
+            detect = sum(seconds for name, seconds in stages.items() if name not in ('intervals', 'mlt_write'))
+            speed = {'detect': audio / detect, 'intervals': audio / max(stages.get('intervals', 0), 1e-9),
+                     'mlt_write': audio / max(stages.get('mlt_write', 0), 1e-9)}
+            error = check_ground_truth(case['sections'], truth, engine)
+            ok = error is not None and error <= args.tolerance
+            failed |= not ok
+            print(f"{size:>4} {engine:>10} {speed['detect']:>10.0f} {speed['intervals']:>12.0f} "
+                  f"{speed['mlt_write']:>10.0f} {case['wall_seconds']:>8.2f} "
+                  f"{case['peak_rss_bytes'] / 2 ** 20:>8.1f} {case['peak_children_rss_bytes'] / 2 ** 20:>9.1f} "
+                  f"{len(case['sections']):>8} "
+                  f"{'COUNT' if error is None else f'{error * 1000:.1f}':>10}{'' if ok else '  MISMATCH'}")
+            results.append({'size': size, 'engine': engine, 'audio_seconds': audio, 'stages': stages,
+                            'x_realtime': speed, 'wall_seconds': case['wall_seconds'],
+                            'peak_rss_bytes': case['peak_rss_bytes'],
+                            'peak_children_rss_bytes': case['peak_children_rss_bytes'],
+                            'sections': len(case['sections']), 'expected_sections': len(truth['segments']),
+                            'max_boundary_error': error, 'ok': ok})
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import json
+import subprocess
+
+from video_editor.audio import get_ffmpeg_binary
+from video_editor.batch import BatchRunner
+
+
+def make_recording(path):
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-y', '-f', 'lavfi', '-i', 'sine=duration=1', str(path)],
+                   check=True)
+    return str(path)
+
+
+def statuses(log_path, input_video):
+    with open(log_path) as f:
+        return [record['status'] for record in map(json.loads, f) if record['input'] == input_video]
+
+
+def test_second_run_skips_completed_jobs_and_retries_failed_ones(tmp_path):
+    inputs = [make_recording(tmp_path / 'first.wav'), make_recording(tmp_path / 'second.wav'),
+              str(tmp_path / 'broken.wav')]
+    (tmp_path / 'broken.wav').write_bytes(b'not a recording')
+    runner = BatchRunner(str(tmp_path / 'out'), threshold=0.01, decode_workers=1, analysis_workers=1)
+
+    assert runner.run(inputs) == {'done': 2, 'failed': 1, 'skipped': 0}
+    assert (tmp_path / 'out' / 'first.mlt').exists() and not (tmp_path / 'out' / 'broken.mlt').exists()
+    assert runner.run(inputs) == {'done': 0, 'failed': 1, 'skipped': 2}
+    assert statuses(runner.log_path, inputs[0]) == ['decoding', 'analyzing', 'done']
+    assert statuses(runner.log_path, inputs[2]) == ['decoding', 'failed'] * 2
+
+    make_recording(tmp_path / 'broken.wav')
+    assert runner.run(inputs) == {'done': 1, 'failed': 0, 'skipped': 2}
+    assert statuses(runner.log_path, inputs[2])[-3:] == ['decoding', 'analyzing', 'done']
+    # A completed job whose output went missing is done again
+    (tmp_path / 'out' / 'second.mlt').unlink()
+    assert runner.run(inputs) == {'done': 1, 'failed': 0, 'skipped': 2}
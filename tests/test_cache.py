@@ -0,0 +1,41 @@
+import os
+import subprocess
+
+import numpy as np
+
+from video_editor.audio import get_ffmpeg_binary
+from video_editor.cache import HASH_BLOCK, EnvelopeCache
+from video_editor.envelope import Envelope
+
+
+def test_recordings_sharing_head_and_tail_get_separate_entries(tmp_path):
+    head, tail = b'h' * HASH_BLOCK, b't' * HASH_BLOCK
+    first, second = tmp_path / 'first.mp4', tmp_path / 'second.mp4'
+    first.write_bytes(head + b'a' * 10 + tail)
+    second.write_bytes(head + b'b' * 20 + tail)
+    cache = EnvelopeCache(str(tmp_path / 'cache'))
+
+    cache.put(str(first), Envelope(np.full(4, 0.5), 100, 44100, nsamples=400))
+    cache.put(str(second), Envelope(np.full(8, 0.25), 100, 44100, nsamples=800))
+
+    assert cache.media_hash(str(first)) == cache.media_hash(str(second))
+    assert list(cache.get(str(first), 100, 44100).means) == [0.5] * 4
+    assert list(cache.get(str(second), 100, 44100).means) == [0.25] * 8
+    assert len(cache.entries()) == 2
+
+
+def test_eviction_leaves_open_pcm_stores(tmp_path):
+    source = str(tmp_path / 'tone.wav')
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'sine=duration=1', source], check=True)
+    # Too small for any entry, so every write evicts everything it may
+    cache = EnvelopeCache(str(tmp_path / 'cache'), max_bytes=1)
+
+    render_store = cache.load_or_decode_pcm(source, 48000, 2)
+    analysis_store = cache.load_or_decode_pcm(source, 16000, 1)
+    cache.put(source, Envelope(np.full(4, 0.5), 100, 44100, nsamples=400))
+    assert os.path.exists(render_store.path) and os.path.exists(analysis_store.path)
+
+    render_store.close()
+    analysis_store.close()
+    cache.evict()
+    assert cache.entries() == []
@@ -0,0 +1,142 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from video_editor.detection import (HysteresisDetector, SilenceTracker, ThresholdDetector, auto_threshold,
+                                    chunk_boundaries, detect_silence, noise_floor, silent_runs, window_magnitudes)
+from video_editor.envelope import Envelope
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'threshold_0.001_chunk_size_100.mp4')
+
+
+def iter_chunks_runs(audio_clip, threshold, chunk_size):
+    """The per-chunk loop detect_silence replaced, as runs of silent chunk indices."""
+    runs = []
+    for index, chunk in enumerate(audio_clip.iter_chunks(fps=audio_clip.fps, chunksize=chunk_size)):
+        if np.mean(np.abs(chunk)) < threshold:
+            if runs and runs[-1][1] == index:
+                runs[-1][1] = index + 1
+            else:
+                runs.append([index, index + 1])
+    return runs
+
+
+@pytest.mark.parametrize('threshold, chunk_size', [(0.0005, 100), (0.002, 500)])
+def test_detect_silence_matches_iter_chunks_loop(threshold, chunk_size):
+    editor = pytest.importorskip('moviepy.editor')
+    with editor.AudioFileClip(SAMPLE) as clip:
+        expected = iter_chunks_runs(clip, threshold, chunk_size)
+    with editor.AudioFileClip(SAMPLE) as clip:
+        step = chunk_size / clip.fps
+        found = [[round(start / step), round(end / step)] for start, end in detect_silence(clip, threshold, chunk_size)]
+    assert len(expected) > 10
+    assert found == expected
+
+
+def test_detect_silence_without_audio():
+    with pytest.raises(ValueError):
+        detect_silence(None)
+
+
+def test_window_magnitudes_match_per_chunk_mean():
+    samples = np.random.default_rng(3).uniform(-1, 1, (10007, 2))
+    bounds = chunk_boundaries(len(samples), 100)
+    expected = [np.mean(np.abs(samples[start:end])) for start, end in zip(bounds[:-1], bounds[1:])]
+    assert np.allclose(window_magnitudes(samples, bounds[:-1]), expected)
+
+
+def gated_noise(rng):
+    """Noise switched on and off in 2000-sample stretches."""
+    return rng.uniform(-1, 1, 100000) * np.repeat(rng.random(50) < 0.5, 2000)
+
+
+def test_tracker_does_not_depend_on_block_sizes():
+    rng = np.random.default_rng(5)
+    samples = gated_noise(rng)
+    whole = SilenceTracker(0.01, 100, analysis_fps=1000)
+    whole.feed(samples)
+    split = SilenceTracker(0.01, 100, analysis_fps=1000)
+    for block in np.split(samples, np.sort(rng.integers(0, len(samples), 40))):
+        split.feed(block)
+    assert split.finish() == whole.finish()
+
+
+def test_tracker_resumes_from_saved_state():
+    rng = np.random.default_rng(6)
+    samples = gated_noise(rng)
+    whole = SilenceTracker(0.01, 100, analysis_fps=1000)
+    whole.feed(samples)
+    resumed = SilenceTracker(0.01, 100, analysis_fps=1000)
+    for index, block in enumerate(np.split(samples, np.sort(rng.integers(0, len(samples), 40)))):
+        if index % 10 == 9:
+            # Restart from a saved state partway, as update_project does between runs
+            resumed = SilenceTracker.from_state(json.loads(json.dumps(resumed.state())))
+        resumed.feed(block)
+    assert resumed.finish() == whole.finish()
+
+
+@pytest.mark.parametrize('method', ['otsu', 'gmm'])
+@pytest.mark.parametrize('levels', [np.zeros(1000), np.full(1000, 0.1), np.full(1000, -30.0)])
+def test_auto_threshold_on_a_single_level_keeps_everything(method, levels):
+    metric = 'db' if levels[0] < 0 else 'magnitude'
+    threshold = auto_threshold(levels, method, metric)
+    assert np.isfinite(threshold)
+    assert len(silent_runs(levels, threshold)[0]) == 0
+
+
+@pytest.mark.parametrize('method', ['otsu', 'gmm'])
+def test_auto_threshold_splits_two_levels(method):
+    levels = np.repeat([0.001, 0.2], [300, 700])
+    assert 0.001 < auto_threshold(levels, method) < 0.2
+
+
+def envelope_of(*runs):
+    """Envelope of 10 ms windows made of (level, windows) runs."""
+    return Envelope(np.concatenate([np.full(count, level) for level, count in runs]), 441, 44100)
+
+
+def runs_of(starts, ends):
+    return list(zip(np.asarray(starts).tolist(), np.asarray(ends).tolist()))
+
+
+def test_hysteresis_does_not_chatter_around_one_level():
+    # Speech, then a level wavering around the on threshold but above the off threshold, then silence
+    envelope = envelope_of((0.001, 10), (0.02, 10), *[(0.009, 1), (0.011, 1)] * 10, (0.004, 10), (0.011, 1),
+                           (0.001, 10))
+    assert len(runs_of(*ThresholdDetector(0.01).detect(envelope))) > 10
+    detector = HysteresisDetector(on_threshold=0.01, off_threshold=0.005, attack=0, release=0)
+    assert runs_of(*detector.detect(envelope)) == [(0, 10), (40, 50), (51, 61)]
+
+
+def test_hysteresis_attack_and_release():
+    envelope = envelope_of((0.001, 100), (0.02, 3), (0.001, 100), (0.02, 10), (0.001, 100))
+    detector = HysteresisDetector(on_threshold=0.01, attack=0.05, release=0.2)
+    # The 30 ms burst is shorter than the attack; the 100 ms phrase is held for 200 ms more
+    assert runs_of(*detector.detect(envelope)) == [(0, 203), (233, 313)]
+
+
+def test_noise_floor_tracks_a_rising_floor():
+    # Ten seconds of speech bursts over a quiet room, then ten over a noisy one
+    bursts = [(0.001, 150), (0.1, 50)] * 5 + [(0.01, 150), (0.1, 50)] * 5
+    levels = envelope_of(*bursts).levels()
+    floor = noise_floor(levels, 50, 4)
+    assert np.allclose(floor[:800], 0.001)
+    assert np.allclose(floor[1200:], 0.01)
+    assert np.all(np.diff(floor) >= 0)
+
+
+def test_adaptive_thresholds_follow_the_noise_floor():
+    envelope = envelope_of(*[(0.001, 150), (0.1, 50)] * 5 + [(0.01, 150), (0.1, 50)] * 5)
+    fixed = HysteresisDetector(on_threshold=0.005, attack=0, release=0)
+    adaptive = HysteresisDetector(on_threshold=0.005, attack=0, release=0, adaptive=True, floor_window=4.0)
+    quiet = [(0, 150), (200, 350), (400, 550), (600, 750), (800, 950)]
+    # The fixed thresholds take the noisy room for speech; the adaptive ones rise 4x / 2x above its floor once
+    # the 4 s floor window has left the quiet room, which misses only the first noisy pause
+    assert runs_of(*fixed.detect(envelope)) == quiet
+    assert runs_of(*adaptive.detect(envelope)) == quiet + [(start, start + 150) for start in range(1200, 2000, 200)]
+    on, off = adaptive.thresholds(envelope, envelope.levels())
+    assert np.allclose(on[:1150], 0.005) and np.allclose(off[:1150], 0.0025)
+    assert np.allclose(on[1150:], 0.04) and np.allclose(off[1150:], 0.02)
@@ -0,0 +1,88 @@
+import subprocess
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from video_editor.audio import get_ffmpeg_binary
+from video_editor.cutlist import CutList
+from video_editor.export import export_edl, export_fcpxml, smpte_timecode
+from video_editor.intervals import IntervalSet
+from video_editor.pipeline import detect_cut_list
+
+
+def make_clip(path, *audio):
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=25:duration=1',
+                    *audio, '-c:v', 'libx264', str(path)], check=True)
+    return str(path)
+
+
+def fcpxml_of(source, tmp_path):
+    path = tmp_path / 'cuts.fcpxml'
+    export_fcpxml(CutList(source, IntervalSet([0, 15], [5, 25]), 25), str(path))
+    return ET.parse(path).getroot()
+
+
+@pytest.mark.parametrize('layout, channels, rate, sequence_rate', [('mono', '1', 16000, '48k'),
+                                                                    ('5.1', '6', 44100, '44.1k')])
+def test_fcpxml_describes_the_source_audio(tmp_path, layout, channels, rate, sequence_rate):
+    source = make_clip(tmp_path / 'clip.mp4', '-f', 'lavfi', '-i', f'sine=duration=1:sample_rate={rate}',
+                       '-ac', channels, '-c:a', 'aac', '-shortest')
+    root = fcpxml_of(source, tmp_path)
+    assert root.get('version') == '1.9'
+    asset = root.find('resources/asset')
+    assert 'src' not in asset.attrib
+    assert asset.find('media-rep').attrib == {'kind': 'original-media', 'src': (tmp_path / 'clip.mp4').as_uri()}
+    assert (asset.get('hasAudio'), asset.get('audioChannels'), asset.get('audioRate')) == ('1', channels, str(rate))
+    sequence = root.find('library/event/project/sequence')
+    assert sequence.get('audioLayout') == {'mono': 'mono', '5.1': 'surround'}[layout]
+    assert sequence.get('audioRate') == sequence_rate
+    assert len(sequence.findall('spine/asset-clip')) == 2
+
+
+def test_fcpxml_of_a_silent_video(tmp_path):
+    asset = fcpxml_of(make_clip(tmp_path / 'video.mp4'), tmp_path).find('resources/asset')
+    assert asset.get('hasAudio') == '0'
+    assert 'audioChannels' not in asset.attrib
+
+
+def test_edl_and_fcpxml_use_the_source_rate_and_size(tmp_path):
+    source = str(tmp_path / 'clip.mp4')
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=30:duration=2',
+                    '-f', 'lavfi', '-i', 'sine=duration=2', '-c:v', 'libx264', '-c:a', 'aac', '-shortest', source],
+                   check=True)
+    detected = detect_cut_list(source, threshold=0.001)
+    assert (detected.frame_rate, detected.source_frame_rate, detected.source_size) == ((25, 1), (30, 1), (160, 120))
+    # Frames 25 to 38 of the 25 fps profile (1 s to 1.52 s) are frames 30 to 46 of the source
+    cut_list = CutList(source, IntervalSet([25], [38]), 50, properties={}, source_frame_rate=(30, 1),
+                       source_size=(160, 120))
+    cut_list.save(str(tmp_path / 'cuts.json'))
+    cut_list = CutList.load(str(tmp_path / 'cuts.json'))
+    assert cut_list.source_frames()[1:] == (60, (30, 1))
+
+    export_edl(cut_list, str(tmp_path / 'cuts.edl'))
+    assert (tmp_path / 'cuts.edl').read_text().splitlines()[3] == \
+        '001  AX       AA/V  C        00:00:01:00 00:00:01:16 01:00:00:00 01:00:00:16'
+    export_fcpxml(cut_list, str(tmp_path / 'cuts.fcpxml'))
+    root = ET.parse(tmp_path / 'cuts.fcpxml').getroot()
+    assert root.find('resources/format').attrib == {'id': 'r1', 'name': 'FFVideoFormat120p30', 'frameDuration': '1/30s',
+                                                    'width': '160', 'height': '120'}
+    assert root.find('resources/asset').get('duration') == '2s'
+    clip = root.find('library/event/project/sequence/spine/asset-clip')
+    assert (clip.get('start'), clip.get('duration')) == ('1s', '8/15s')
+
+
+@pytest.mark.parametrize('frame, frame_rate, timecode', [
+    (1799, (30000, 1001), '00:00:59;29'), (1800, (30000, 1001), '00:01:00;02'), (17982, (30000, 1001), '00:10:00;00'),
+    (107892, (30000, 1001), '01:00:00;00'), (3600, (60000, 1001), '00:01:00;04'), (35964, (60000, 1001), '00:10:00;00'),
+    (1800, (30, 1), '00:01:00:00'), (90000, (25, 1), '01:00:00:00')])
+def test_smpte_timecode(frame, frame_rate, timecode):
+    assert smpte_timecode(frame, frame_rate) == timecode
+
+
+def test_drop_frame_edl(tmp_path):
+    cut_list = CutList('talk.mov', IntervalSet([1800], [17982]), 20000, 'hdv_720_30p', source_frame_rate=(30000, 1001))
+    export_edl(cut_list, str(tmp_path / 'cuts.edl'))
+    with open(tmp_path / 'cuts.edl', newline='') as f:
+        assert f.read() == ('TITLE: talk\r\nFCM: DROP FRAME\r\n\r\n'
+                            '001  AX       AA/V  C        00:01:00;02 00:10:00;00 01:00:00;00 01:08:59;28\r\n'
+                            '* FROM CLIP NAME: talk.mov\r\n')
@@ -0,0 +1,60 @@
+import os
+import subprocess
+
+import pytest
+
+from video_editor.audio import get_ffmpeg_binary
+from video_editor.cache import HASH_BLOCK
+from video_editor.incremental import update_project
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'threshold_0.001_chunk_size_100.mp4')
+
+
+def encode_adts(path, bitrate):
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-y', '-i', SAMPLE, '-vn', '-c:a', 'aac', '-b:a', bitrate,
+                    '-f', 'adts', str(path)], check=True)
+    return path.read_bytes()
+
+
+@pytest.fixture(scope='module')
+def recording(tmp_path_factory):
+    """The sample's audio as raw ADTS AAC, a format that stays decodable while it is being appended to."""
+    return encode_adts(tmp_path_factory.mktemp('recording') / 'full.aac', '128k')
+
+
+def grow_and_update(data, split, tmp_path):
+    growing, output = tmp_path / 'growing.aac', str(tmp_path / 'growing.mlt')
+    growing.write_bytes(data[:split])
+    update_project(str(growing), output)
+    with open(growing, 'ab') as f:
+        f.write(data[split:])
+    voiced, decoded = update_project(str(growing), output)
+    expected, duration = update_project(str(growing), str(tmp_path / 'full.mlt'))
+    assert voiced == expected
+    with open(output, 'rb') as patched, open(tmp_path / 'full.mlt', 'rb') as rewritten:
+        assert patched.read() == rewritten.read()
+    return decoded, duration
+
+
+def test_update_after_append_matches_full_analysis(recording, tmp_path):
+    decoded, duration = grow_and_update(recording, len(recording) * 3 // 4, tmp_path)
+    assert decoded < duration / 3
+
+
+def test_update_after_a_short_file_grows_past_the_hashed_head(recording, tmp_path):
+    # Under HASH_BLOCK at first, so the stored hash covers the whole file as it was then
+    split = len(recording) // 2
+    assert split < HASH_BLOCK < len(recording)
+    decoded, duration = grow_and_update(recording, split, tmp_path)
+    assert decoded < duration * 0.6
+
+
+def test_replaced_input_is_analyzed_again(recording, tmp_path):
+    growing, output = tmp_path / 'growing.aac', str(tmp_path / 'growing.mlt')
+    growing.write_bytes(recording[:len(recording) // 2])
+    update_project(str(growing), output)
+    # Longer than before but with different bytes at the start
+    encode_adts(growing, '160k')
+    voiced, decoded = update_project(str(growing), output)
+    assert (voiced, decoded) == update_project(str(growing), str(tmp_path / 'full.mlt'))
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from video_editor.detection import mask_runs
+from video_editor.intervals import IntervalSet, coverage, voiced_frames
+from video_editor.timecode import PROFILE_FRAME_RATES, frames_to_timecodes, samples_to_frames
+
+LENGTH = 200
+
+
+def random_set(rng, length=LENGTH, count=12):
+    starts = rng.integers(0, length, count)
+    return IntervalSet.from_pairs(np.column_stack((starts, starts + rng.integers(0, 25, count))))
+
+
+def to_mask(intervals, length=LENGTH):
+    mask = np.zeros(length, dtype=bool)
+    for start, end in intervals:
+        mask[start:end] = True
+    return mask
+
+
+def from_mask(mask):
+    return IntervalSet(*mask_runs(mask))
+
+
+def fill_gaps(mask, max_gap, edges=False):
+    """Set every run of False no longer than max_gap; the runs at either end only with edges."""
+    mask = mask.copy()
+    for start, end in zip(*mask_runs(~mask)):
+        inner = start > 0 and end < len(mask)
+        if end - start <= max_gap and (inner or (edges and mask.any())):
+            mask[start:end] = True
+    return mask
+
+
+def assert_canonical(intervals):
+    """Sorted, non-empty and separated by real gaps."""
+    assert (intervals.ends > intervals.starts).all()
+    assert (intervals.starts[1:] > intervals.ends[:-1]).all()
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(12)
+
+
+def test_from_pairs_sorts_and_joins(rng):
+    for _ in range(200):
+        pairs = rng.integers(0, LENGTH, (10, 2))
+        intervals = IntervalSet.from_pairs(pairs)
+        assert_canonical(intervals)
+        assert intervals == from_mask(to_mask(pairs))
+
+
+def test_union_and_intersection_match_masks(rng):
+    for _ in range(200):
+        sets = [random_set(rng) for _ in range(3)]
+        masks = [to_mask(s, LENGTH + 25) for s in sets]
+        union = sets[0].union(*sets[1:])
+        intersection = sets[0].intersection(*sets[1:])
+        assert_canonical(union)
+        assert union == from_mask(np.logical_or.reduce(masks))
+        assert intersection == from_mask(np.logical_and.reduce(masks))
+        assert coverage(sets, 2) == from_mask(np.sum(masks, axis=0) >= 2)
+
+
+def test_touching_intervals_neither_overlap_nor_split():
+    left, right = IntervalSet([0], [10]), IntervalSet([10], [20])
+    assert left.union(right) == IntervalSet([0], [20])
+    assert left.intersection(right) == IntervalSet()
+
+
+def test_complement_matches_mask(rng):
+    for _ in range(200):
+        intervals = random_set(rng)
+        length = int(intervals.ends.max(initial=0))
+        assert intervals.complement(length) == from_mask(~to_mask(intervals, length))
+
+
+def test_merge_gaps_matches_mask(rng):
+    for max_gap in (0, 1, 5, 30):
+        for _ in range(50):
+            intervals = random_set(rng)
+            mask = to_mask(intervals, LENGTH + 25)
+            assert intervals.merge_gaps(max_gap) == from_mask(fill_gaps(mask, max_gap))
+
+
+@pytest.mark.parametrize('pre_roll, post_roll', [(0, 0), (3, 0), (0, 7), (5, 5)])
+def test_pad_matches_mask(rng, pre_roll, post_roll):
+    for _ in range(100):
+        intervals = random_set(rng)
+        expected = np.zeros(LENGTH, dtype=bool)
+        for start, end in intervals:
+            expected[max(start - pre_roll, 0):min(end + post_roll, LENGTH)] = True
+        padded = intervals.pad(pre_roll, post_roll, LENGTH)
+        assert_canonical(padded)
+        assert padded == from_mask(expected)
+
+
+def test_pad_drops_intervals_past_length():
+    intervals = IntervalSet([1, 10, 20], [3, 12, 30])
+    assert intervals.pad(0, 0, 5) == IntervalSet([1], [3])
+    assert intervals.pad(2, 2, 10) == IntervalSet([0, 8], [5, 10])
+    assert intervals.pad(0, 0, 0) == IntervalSet()
+
+
+def test_remove_shorter(rng):
+    for _ in range(100):
+        intervals = random_set(rng)
+        kept = intervals.remove_shorter(5)
+        assert list(kept) == [(start, end) for start, end in intervals if end - start >= 5]
+
+
+@pytest.mark.parametrize('min_gap', [1, 4, 12])
+def test_fill_gaps_shorter_matches_mask(rng, min_gap):
+    for _ in range(100):
+        intervals = random_set(rng, LENGTH - 30)
+        mask = to_mask(intervals)
+        assert intervals.fill_gaps_shorter(min_gap) == from_mask(fill_gaps(mask, min_gap - 1))
+        assert intervals.fill_gaps_shorter(min_gap, LENGTH) == from_mask(fill_gaps(mask, min_gap - 1, edges=True))
+
+
+def test_to_frames_joins_touching_and_drops_fragments():
+    # 25 fps at 1000 Hz: 40 samples per frame
+    intervals = IntervalSet([0, 95, 300, 400], [81, 200, 330, 520])
+    assert intervals.to_frames(1000, (25, 1)) == IntervalSet([0, 10], [5, 13])
+
+
+@pytest.mark.parametrize('profile', sorted(PROFILE_FRAME_RATES))
+def test_timecodes_map_back_to_their_frames(profile):
+    num, den = PROFILE_FRAME_RATES[profile]
+    frames = np.arange(0, 8 * 3600 * num // den, 7)
+    timecodes = frames_to_timecodes(frames, (num, den))
+    hours, minutes, seconds = np.array([timecode.split(':') for timecode in timecodes]).T
+    milliseconds = (hours.astype(np.int64) * 3600 + minutes.astype(np.int64) * 60) * 1000 \
+        + np.round(seconds.astype(np.float64) * 1000).astype(np.int64)
+    # MLT takes the frame a clock time falls in, rounding to nearest
+    assert np.array_equal(np.round(milliseconds * num / (1000 * den)).astype(np.int64), frames)
+
+
+def test_voiced_frames_has_no_float_drift():
+    # Every 5th frame at 29.97 fps starts on a whole sample at 48 kHz; place silent runs there up to eight hours in
+    frame_rate, sample_rate = (30000, 1001), 48000
+    frames = np.arange(0, 8 * 3600 * 30, 5 * 97)[:1780]
+    samples = frames * sample_rate * 1001 // 30000
+    assert np.array_equal(samples_to_frames(samples, sample_rate, frame_rate), frames)
+    nsamples = int(samples[-1]) + sample_rate
+    voiced = voiced_frames(samples[0::2], samples[1::2], nsamples, sample_rate, frame_rate)
+    assert_canonical(voiced)
+    assert np.array_equal(voiced.starts, frames[1::2])
+    assert np.array_equal(voiced.ends[:-1], frames[2::2])
+    assert voiced.ends[-1] == samples_to_frames(nsamples, sample_rate, frame_rate)
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from video_editor.intervals import IntervalSet
+from video_editor.live import KeptFrames
+
+
+@pytest.mark.parametrize('frame_rate', [(25, 1), (30000, 1001)])
+def test_kept_frames_match_to_frames(frame_rate):
+    rng = np.random.default_rng(7)
+    for _ in range(50):
+        # Alternating keep and cut segments, many of them shorter than a frame
+        bounds = np.cumsum(rng.integers(1, 4000, 2 * rng.integers(1, 40)))
+        keeps = bounds.reshape(-1, 2)
+        kept = KeptFrames(16000, frame_rate)
+        previous = np.empty((0, 2), dtype=np.int64)
+        for count, (start, end) in enumerate(keeps.tolist(), 1):
+            unchanged = kept.add(start, end)
+            expected = IntervalSet.from_pairs(keeps[:count]).to_frames(16000, frame_rate)
+            assert kept.frames.tolist() == list(map(list, expected))
+            assert kept.frames[:unchanged].tolist() == previous[:unchanged].tolist()
+            previous = kept.frames.copy()
@@ -0,0 +1,53 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from video_editor import mlt
+from video_editor.mlt import patch_mlt, unchanged_entries, write_mlt
+from video_editor.timecode import frames_to_timecodes
+
+RESOURCE = '/media/Q&A <live> "final".mp4'
+
+
+def entries(path):
+    return [(entry.get('producer'), entry.get('in'), entry.get('out')) for entry in ET.parse(path).iter('entry')]
+
+
+def expected_entries(frames):
+    starts, ends = zip(*frames)
+    return list(zip(['chain0'] * len(frames), frames_to_timecodes(starts, (25, 1)),
+                    frames_to_timecodes([end - 1 for end in ends], (25, 1))))
+
+
+def test_resource_and_properties_are_escaped(tmp_path):
+    path = tmp_path / 'project.mlt'
+    write_mlt(str(path), RESOURCE, [(0, 10)], 100, properties={'video_editor:note': 'a < b & "c"'})
+    root = ET.parse(path).getroot()
+    assert root.find("chain/property[@name='resource']").text == RESOURCE
+    assert root.find("tractor/property[@name='video_editor:note']").text == 'a < b & "c"'
+
+
+def test_patched_project_matches_a_fresh_write(tmp_path, monkeypatch):
+    path, fresh = tmp_path / 'project.mlt', tmp_path / 'fresh.mlt'
+    previous = [(0, 10), (20, 35), (50, 60), (70, 80)]
+    frames = [(0, 10), (20, 35), (50, 64), (90, 120), (130, 2600)]
+    write_mlt(str(path), RESOURCE, previous, 100, properties={'video_editor:threshold': '0.01'})
+    unchanged = unchanged_entries(previous, frames)
+    assert unchanged == 2
+
+    # Patching in place must not fall back to rewriting the whole file
+    with monkeypatch.context() as patched:
+        patched.setattr(mlt, 'write_mlt', pytest.fail)
+        patch_mlt(str(path), RESOURCE, frames, unchanged, 3000, properties={'video_editor:threshold': '0.02'})
+    write_mlt(str(fresh), RESOURCE, frames, 3000, properties={'video_editor:threshold': '0.02'})
+    assert path.read_bytes() == fresh.read_bytes()
+    assert entries(path) == expected_entries(frames)
+    assert ET.parse(path).find('chain').get('out') == '00:01:59.960'
+
+
+def test_patch_falls_back_to_a_full_write(tmp_path):
+    path = tmp_path / 'project.mlt'
+    write_mlt(str(path), '/media/other.mp4', [(0, 10), (20, 30)], 100)
+    patch_mlt(str(path), RESOURCE, [(0, 10), (20, 40)], 1, 100)
+    assert entries(path) == expected_entries([(0, 10), (20, 40)])
+    assert ET.parse(path).find("chain/property[@name='resource']").text == RESOURCE
@@ -0,0 +1,33 @@
+import subprocess
+import xml.etree.ElementTree as ET
+
+from video_editor.audio import get_ffmpeg_binary
+from video_editor.intervals import IntervalSet
+from video_editor.multitrack import detect_multitrack_frames, generate_multitrack_project
+
+
+def make_track(path, start, end):
+    """Four seconds of silence with a tone from start to end seconds."""
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'sine=duration=4:samples_per_frame=441',
+                    '-af', f'volume=enable=not(between(t\\,{start}\\,{end - 0.001})):volume=0', str(path)], check=True)
+    return str(path)
+
+
+def test_tracks_are_kept_wherever_any_of_them_is_voiced(tmp_path):
+    tracks = [(make_track(tmp_path / 'host.wav', 0, 1), None), (make_track(tmp_path / 'guest.wav', 2, 3), None)]
+    voiced, lengths, _ = detect_multitrack_frames(tracks, threshold=0.01)
+    assert voiced == IntervalSet([0, 50], [25, 75])
+    assert lengths == [100, 100]
+
+    output = tmp_path / 'project.mlt'
+    sections, _ = generate_multitrack_project([path for path, _ in tracks], str(output), threshold=0.01)
+    assert sections == [(0.0, 1.0), (2.0, 3.0)]
+    root = ET.parse(output).getroot()
+    assert [chain.find("property[@name='resource']").text for chain in root.findall('chain')] == \
+        [path for path, _ in tracks]
+    playlists = root.findall('playlist')
+    assert [playlist.get('id') for playlist in playlists] == ['playlist0', 'playlist1']
+    for i, playlist in enumerate(playlists):
+        assert [(entry.get('producer'), entry.get('in'), entry.get('out')) for entry in playlist.findall('entry')] == \
+            [(f'chain{i}', '00:00:00.000', '00:00:00.960'), (f'chain{i}', '00:00:02.000', '00:00:02.960')]
+    assert [track.get('producer') for track in root.findall('tractor/track')] == ['playlist0', 'playlist1']
@@ -0,0 +1,81 @@
+import re
+import subprocess
+
+import pytest
+
+from video_editor.audio import get_ffmpeg_binary, probe_video_rate
+from video_editor.parallel import render_parallel
+from video_editor.pipeline import remove_silence
+from video_editor.sequential import render_sequential
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    """Two seconds of 30 fps video with a tone, not a rate of any MLT profile the renderers default to."""
+    path = str(tmp_path_factory.mktemp('render') / 'clip.mp4')
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=30:duration=2',
+                    '-f', 'lavfi', '-i', 'sine=duration=2', '-c:v', 'libx264', '-g', '15', '-c:a', 'aac', '-shortest',
+                    path], check=True)
+    return path
+
+
+def count_frames(filename):
+    proc = subprocess.run([get_ffmpeg_binary(), '-i', filename, '-map', '0:v', '-f', 'null', '-'],
+                          stderr=subprocess.PIPE, check=True)
+    return int(re.findall(rb'frame=\s*(\d+)', proc.stderr)[-1])
+
+
+def test_sequential_render_keeps_the_source_frame_rate(clip, tmp_path):
+    output = str(tmp_path / 'sequential.mp4')
+    render_sequential(clip, output, [(0, 10), (20, 35)])
+    assert probe_video_rate(output) == (30, 1)
+    assert count_frames(output) == 25
+
+
+def test_parallel_render_keeps_the_source_frame_rate(clip, tmp_path):
+    output = str(tmp_path / 'parallel.mp4')
+    render_parallel(clip, output, [(0, 1 / 3), (2 / 3, 7 / 6)], workers=1)
+    assert probe_video_rate(output) == (30, 1)
+    assert count_frames(output) == 25
+
+
+@pytest.fixture(scope='module')
+def noisy(tmp_path_factory):
+    """Noise near the threshold: windows at another rate would be cut in other places."""
+    path = str(tmp_path_factory.mktemp('noisy') / 'noisy.mp4')
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=30:duration=2',
+                    '-f', 'lavfi', '-i', 'anoisesrc=d=2:c=white:a=0.02:seed=1', '-c:v', 'libx264', '-c:a', 'aac',
+                    '-shortest', path], check=True)
+    return path
+
+
+# Each threshold is around the 10th percentile of the window levels at that rate
+@pytest.mark.parametrize('analysis_fps, threshold', [(None, 0.0068), (16000, 0.0045)])
+@pytest.mark.parametrize('cached', [False, True])
+def test_pcm_store_does_not_change_the_cuts(noisy, tmp_path, analysis_fps, threshold, cached):
+    options = {'threshold': threshold, 'analysis_fps': analysis_fps, 'export_mode': 'sequential',
+               'cache_dir': str(tmp_path / 'cache') if cached else None}
+    expected, _ = remove_silence(noisy, str(tmp_path / 'decoded.mp4'), **options)
+    sections, _ = remove_silence(noisy, str(tmp_path / 'stored.mp4'), pcm_store=True, **options)
+    assert len(expected) > 5
+    assert sections == expected
+
+
+def decoded_audio(filename):
+    return subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-i', filename, '-map', '0:a', '-f', 's16le', '-'],
+                          stdout=subprocess.PIPE, check=True).stdout
+
+
+def test_stream_copy_reads_the_pcm_store(noisy, tmp_path):
+    options = {'threshold': 0.0068, 'export_mode': 'smart'}
+    expected, _ = remove_silence(noisy, str(tmp_path / 'decoded.mp4'), **options)
+    sections, _ = remove_silence(noisy, str(tmp_path / 'stored.mp4'), pcm_store=True, **options)
+    assert sections == expected
+    assert count_frames(str(tmp_path / 'stored.mp4')) == count_frames(str(tmp_path / 'decoded.mp4'))
+    assert decoded_audio(str(tmp_path / 'stored.mp4')) == decoded_audio(str(tmp_path / 'decoded.mp4'))
+
+
+@pytest.mark.parametrize('options', [{'export_mode': 'fast'}, {'export_mode': 'reencode', 'pcm_store': True}])
+def test_bad_modes_are_rejected_before_any_work(tmp_path, options):
+    with pytest.raises(ValueError):
+        remove_silence(str(tmp_path / 'missing.mp4'), str(tmp_path / 'out.mp4'), **options)
@@ -0,0 +1,61 @@
+import re
+import subprocess
+
+import pytest
+
+from video_editor.audio import get_ffmpeg_binary
+from video_editor.stream_copy import export_stream_copy, smart_pieces, snap_to_keyframes
+
+KEYFRAMES = [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+@pytest.mark.parametrize('sections, pieces, gops', [
+    # Inside one GOP: nothing to copy
+    ([(1.2, 1.8)], [('encode', 1.2, 1.8)], [(1.0, 2.0)]),
+    # Across several GOPs: the whole ones between the partial ends are copied
+    ([(0.5, 3.5)], [('encode', 0.5, 1.0), ('copy', 1.0, 3.0), ('encode', 3.0, 3.5)], [(0.0, 4.0)]),
+    ([(1.0, 2.5)], [('copy', 1.0, 2.0), ('encode', 2.0, 2.5)], [(1.0, 3.0)]),
+    ([(0.5, 3.0)], [('encode', 0.5, 1.0), ('copy', 1.0, 3.0)], [(0.0, 3.0)]),
+    # Cuts within KEYFRAME_TOLERANCE of a keyframe count as landing on it
+    ([(1.0005, 2.9995)], [('copy', 1.0, 2.9995)], [(1.0, 3.0)]),
+    # Adjacent sections stay apart when encoded, and join once widened to the same GOPs
+    ([(0.5, 1.5), (1.5, 2.5)], [('encode', 0.5, 1.5), ('encode', 1.5, 2.5)], [(0.0, 3.0)]),
+    ([(1.0, 2.0), (2.0, 3.0)], [('copy', 1.0, 2.0), ('copy', 2.0, 3.0)], [(1.0, 3.0)]),
+])
+def test_pieces_and_gops(sections, pieces, gops):
+    assert smart_pieces(sections, KEYFRAMES) == pieces
+    assert snap_to_keyframes(sections, KEYFRAMES) == gops
+
+
+def test_snap_past_the_last_keyframe():
+    assert snap_to_keyframes([(3.5, 4.6)], KEYFRAMES, 5.0) == [(3.0, 5.0)]
+    assert snap_to_keyframes([(3.5, 4.6)], KEYFRAMES) == [(3.0, 4.6)]
+    assert snap_to_keyframes([(0.2, 0.4)], [0.5, 1.0]) == [(0.0, 0.5)]
+
+
+@pytest.fixture(scope='module')
+def clip(tmp_path_factory):
+    """Four seconds at 30 fps with a keyframe every 10 frames and B-frames between them."""
+    path = str(tmp_path_factory.mktemp('stream_copy') / 'clip.mp4')
+    subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-f', 'lavfi', '-i', 'testsrc=size=160x120:rate=30:duration=4',
+                    '-f', 'lavfi', '-i', 'sine=duration=4', '-c:v', 'libx264', '-g', '10', '-sc_threshold', '0',
+                    '-bf', '2', '-c:a', 'aac', '-shortest', path], check=True)
+    return path
+
+
+def decode(filename):
+    """Errors ffmpeg reports while decoding every stream, and the video frame count and audio duration."""
+    proc = subprocess.run([get_ffmpeg_binary(), '-v', 'error', '-stats', '-i', filename, '-f', 'null', '-'],
+                          stderr=subprocess.PIPE, check=True)
+    log = proc.stderr.decode()
+    errors = [line for line in log.splitlines() if 'frame=' not in line and line.strip()]
+    frames = int(re.findall(r'frame=\s*(\d+)', log)[-1])
+    return errors, frames
+
+
+@pytest.mark.parametrize('mode, frames', [('keyframe', 70), ('smart', 43)])
+def test_stream_copy_output_decodes_cleanly(clip, tmp_path, mode, frames):
+    output = str(tmp_path / f'{mode}.mp4')
+    # Frames [15, 33), [57, 70) and [90, 102); keyframe mode widens them to [10, 40), [50, 70) and [90, 110)
+    export_stream_copy(clip, output, [(0.5, 1.1), (1.9, 2.35), (3.0, 3.4)], mode=mode)
+    assert decode(output) == ([], frames)
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+from video_editor.envelope import compute_envelope
+from video_editor.sweep import sweep
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'threshold_0.001_chunk_size_100.mp4')
+
+
+@pytest.fixture(scope='module', params=[('magnitude', None), ('rms', None), ('magnitude', 16000)],
+                ids=['magnitude', 'rms', 'magnitude-16k'])
+def envelope(request):
+    metric, analysis_fps = request.param
+    return compute_envelope(SAMPLE, 100, metric=metric, analysis_fps=analysis_fps)
+
+
+@pytest.mark.parametrize('chunk_size', [500, 2200])
+def test_rebinned_envelope_matches_a_direct_analysis(envelope, chunk_size):
+    direct = compute_envelope(SAMPLE, chunk_size, metric=envelope.metric, analysis_fps=envelope.analysis_fps)
+    rebinned = envelope.rebin(chunk_size)
+    assert (rebinned.nsamples, len(rebinned)) == (direct.nsamples, len(direct))
+    np.testing.assert_allclose(rebinned.means, direct.means, rtol=1e-5, atol=1e-9)
+
+    thresholds = [0.001, 0.005, 'otsu']
+    swept = list(sweep(envelope, thresholds, [chunk_size], [0.0, 0.5]))
+    expected = list(sweep(direct, thresholds, [chunk_size], [0.0, 0.5]))
+    assert [result['voiced_frames'] for result in swept] == [result['voiced_frames'] for result in expected]
+    assert max(len(result['voiced_frames']) for result in swept) > 5
+
+
+def test_rebin_needs_a_multiple_of_the_window(envelope):
+    with pytest.raises(ValueError):
+        envelope.rebin(250)
@@ -0,0 +1,47 @@
+"""Silence removal for recordings, with Shotcut (MLT) project and video output.
+
+Submodules are imported on first attribute access, so importing the package
+(or running the CLI's --help) does not load NumPy, MoviePy or ffmpeg.
+"""
+import importlib
+
+__version__ = '0.1.0'
+
+_EXPORTS = {
+    'detect_silence': 'detection',
+    'detect_silence_in_file': 'detection',
+    'SilenceTracker': 'detection',
+    'ThresholdDetector': 'detection',
+    'HysteresisDetector': 'detection',
+    'CutList': 'cutlist',
+    'export_cut_list': 'export',
+    'Envelope': 'envelope',
+    'compute_envelope': 'envelope',
+    'EnvelopeCache': 'cache',
+    'PcmStore': 'pcm',
+    'IntervalSet': 'intervals',
+    'Profiler': 'profiling',
+    'seconds_to_timecode': 'timecode',
+    'write_mlt': 'mlt',
+    'detect_cut_list': 'pipeline',
+    'detect_voiced_frames': 'pipeline',
+    'detect_voiced_sections': 'pipeline',
+    'generate_shotcut_project': 'pipeline',
+    'update_project': 'incremental',
+    'generate_multitrack_project': 'multitrack',
+    'remove_silence': 'pipeline',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
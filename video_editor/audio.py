@@ -0,0 +1,138 @@
+import os
+import re
+import subprocess
+from fractions import Fraction
+
+import numpy as np
+
+# MoviePy decodes audio at this rate unless told otherwise
+DEFAULT_FPS = 44100
+
+
+def get_ffmpeg_binary():
+    """Locate ffmpeg the same way MoviePy does (FFMPEG_BINARY, then imageio-ffmpeg)."""
+    binary = os.environ.get('FFMPEG_BINARY')
+    if binary and binary != 'ffmpeg-imageio':
+        return binary
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return 'ffmpeg'
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def iter_pcm_blocks(filename, fps=DEFAULT_FPS, block_size=1 << 16, nbuffers=2, start_sample=0, stream=None,
+                    channels=1):
+    """Decode an audio stream of a media file (the first one by default) as mono s16 PCM.
+
+    ffmpeg writes raw samples to a pipe that is read straight into a small
+    ring of preallocated int16 buffers; no video decoder is opened. Each
+    yielded block is a view into the ring, so it is only valid until
+    ``nbuffers`` more blocks have been read. With start_sample, decoding
+    starts that many samples (at ``fps``) into the stream; ``stream``
+    picks the N-th audio stream. With more than one channel, blocks are
+    (samples, channels) arrays of interleaved PCM.
+    """
+    seek = ['-ss', repr(start_sample / fps)] if start_sample else []
+    select = ['-map', f'0:a:{stream}'] if stream is not None else []
+    cmd = [get_ffmpeg_binary(), '-v', 'error', '-nostdin', *seek, '-i', filename, *select,
+           '-vn', '-sn', '-dn', '-ac', str(channels), '-ar', str(fps),
+           '-f', 's16le', '-acodec', 'pcm_s16le', '-']
+    ring = [np.empty(block_size * channels, dtype=np.int16) for _ in range(nbuffers)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+    try:
+        current = 0
+        while True:
+            buffer = memoryview(ring[current]).cast('B')
+            filled = 0
+            while filled < len(buffer):
+                nread = proc.stdout.readinto(buffer[filled:])
+                if not nread:
+                    break
+                filled += nread
+            nsamples = filled // (2 * channels)
+            if nsamples:
+                block = ring[current][:nsamples * channels]
+                yield block.reshape(-1, channels) if channels > 1 else block
+            if filled < len(buffer):
+                break
+            current = (current + 1) % nbuffers
+
+        proc.stdout.close()
+        error = proc.stderr.read().decode('utf8', 'replace')
+        if proc.wait() != 0:
+            raise IOError(f"ffmpeg failed to decode the audio of {filename}:\n{error}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def _media_info(filename):
+    """The stream listing ``ffmpeg -i`` prints, which needs no ffprobe binary."""
+    proc = subprocess.run([get_ffmpeg_binary(), '-hide_banner', '-nostdin', '-i', filename],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    info = proc.stderr.decode('utf8', 'replace')
+    if not re.search(r'^\s*Stream #0:', info, re.MULTILINE):
+        raise IOError(f"ffmpeg could not read the streams of {filename}:\n{info}")
+    return info
+
+
+def probe_streams(filename):
+    """Return the container's streams as (index, kind) pairs, kind being 'Audio', 'Video', ..."""
+    streams = re.findall(r'^\s*Stream #0:(\d+)\S*: (\w+):', _media_info(filename), re.MULTILINE)
+    return [(int(index), kind) for index, kind in streams]
+
+
+def probe_duration(filename):
+    """Duration of the container in seconds, or None when ffmpeg does not know it."""
+    match = re.search(r'^\s*Duration: (\d+):(\d+):([\d.]+)', _media_info(filename), re.MULTILINE)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+AUDIO_LAYOUTS = {'mono': 1, 'stereo': 2, '2.1': 3, '3.0': 3, 'quad': 4, '4.0': 4, '5.0': 5, '5.1': 6, '6.1': 7,
+                 '7.1': 8}
+
+
+def probe_audio_format(filename):
+    """(sample_rate, channels) of the first audio stream, or None when there is no audio."""
+    match = re.search(r'^\s*Stream #0:\d+\S*: Audio:.*?, (\d+) Hz, ([^,]+)', _media_info(filename), re.MULTILINE)
+    if not match:
+        return None
+    layout = match.group(2).split('(')[0].strip()
+    count = re.match(r'(\d+) channels', layout)
+    return int(match.group(1)), int(count.group(1)) if count else AUDIO_LAYOUTS.get(layout, 2)
+
+
+def probe_video_size(filename):
+    """(width, height) of the first video stream, or None when there is no video."""
+    match = re.search(r'^\s*Stream #0:\d+\S*: Video:.*?, (\d+)x(\d+)', _media_info(filename), re.MULTILINE)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def probe_codec(filename, kind='Video'):
+    """Codec name ('h264', 'aac', ...) of the first stream of a kind, or None when there is none."""
+    match = re.search(rf'^\s*Stream #0:\d+\S*: {kind}: (\w+)', _media_info(filename), re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def probe_video_rate(filename):
+    """(num, den) frame rate of the first video stream, or None when there is no video.
+
+    ffmpeg prints the rate rounded to two decimals, so NTSC rates such as
+    29.97 come back as 30000/1001.
+    """
+    match = re.search(r'^\s*Stream #0:\d+\S*: Video:.*?, ([\d.]+) (?:fps|tbr)', _media_info(filename),
+                      re.MULTILINE)
+    if not match:
+        return None
+    rate = float(match.group(1))
+    if rate == round(rate):
+        return (round(rate), 1)
+    if abs(rate - round(rate * 1.001) / 1.001) < 0.01:
+        return (round(rate * 1.001) * 1000, 1001)
+    rate = Fraction(match.group(1)).limit_denominator(1001)
+    return (rate.numerator, rate.denominator)
@@ -0,0 +1,223 @@
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from .audio import DEFAULT_FPS
+from .cache import EnvelopeCache
+from .envelope import compute_envelope
+from .intervals import voiced_frames
+from .timecode import DEFAULT_PROFILE, frames_to_seconds, profile_frame_rate, samples_to_frames
+
+VIDEO_PATTERNS = ('*.mp4', '*.mov', '*.mkv', '*.avi', '*.m4v')
+
+
+def decode_job(input_video, chunk_size, fps, cache_dir, store_path):
+    """I/O-bound stage: decode the audio into a PCM store at store_path for the analysis stage.
+
+    Returns store_path, or None when the envelope is already cached and
+    there is nothing to decode.
+    """
+    from .pcm import write_pcm_store
+
+    if cache_dir and EnvelopeCache(cache_dir).get(input_video, chunk_size, fps) is not None:
+        return None
+    write_pcm_store(store_path, input_video, fps, 1).close()
+    return store_path
+
+
+def analyze_job(store_path, input_video, output_file, threshold, merge_threshold, chunk_size=100, fps=DEFAULT_FPS,
+                cache_dir=None, profile=DEFAULT_PROFILE):
+    """CPU-bound stage: reduce the samples to an envelope, find the voiced sections and write the MLT project.
+
+    The samples are read from the memory-mapped PCM store at store_path,
+    which is removed afterwards; with None the envelope comes from the
+    cache. The project is moved into place only once it is complete.
+    """
+    from .mlt import write_mlt
+    from .pcm import PcmStore
+
+    store = PcmStore(store_path) if store_path else None
+    try:
+        if cache_dir:
+            envelope = EnvelopeCache(cache_dir).load_or_compute(input_video, chunk_size, fps, pcm=store)
+        else:
+            envelope = compute_envelope(input_video, chunk_size, fps, pcm=store)
+    finally:
+        if store is not None:
+            store.close()
+            os.unlink(store_path)
+
+    frame_rate = profile_frame_rate(profile)
+    properties = {}
+    if isinstance(threshold, str):
+        properties['video_editor:threshold_method'] = threshold
+        threshold = envelope.auto_threshold(threshold)
+    properties['video_editor:threshold'] = f'{threshold:.6g}'
+    voiced = voiced_frames(*envelope.silent_sample_runs(threshold), envelope.nsamples,
+                           envelope.analysis_fps, frame_rate, merge_threshold)
+    length = int(samples_to_frames(envelope.nsamples, envelope.analysis_fps, frame_rate))
+
+    partial = output_file + '.partial'
+    write_mlt(partial, input_video, list(voiced), length, profile, properties)
+    os.replace(partial, output_file)
+    return {'sections': len(voiced), 'kept_duration': float(frames_to_seconds(voiced.total(), frame_rate)),
+            'duration': envelope.duration, 'threshold': threshold}
+
+
+class BatchRunner:
+    """Bounded two-stage job queue with a JSONL status log.
+
+    Decoding runs on a thread pool and only has ffmpeg write the samples to
+    a PCM store in a scratch directory; analysis (the window reduction over
+    every sample, thresholding and the MLT writer) runs on a process pool
+    that maps the store, so only its path crosses the process boundary.
+    Each pool has its own concurrency limit. Every state
+    change is appended to the log; on restart, jobs whose last record is
+    'done' and whose output still exists are skipped, and since outputs are
+    only moved into place once complete a crash never leaves a half-written
+    project behind.
+    """
+
+    def __init__(self, output_dir, log_path=None, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                 fps=DEFAULT_FPS, decode_workers=2, analysis_workers=None, max_pending=None, cache_dir=None):
+        self.output_dir = output_dir
+        self.log_path = log_path or os.path.join(output_dir, 'jobs.jsonl')
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.merge_threshold = merge_threshold
+        self.fps = fps
+        self.decode_workers = decode_workers
+        self.analysis_workers = analysis_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * (self.decode_workers + self.analysis_workers)
+        self.cache_dir = cache_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+    def job_id(self, input_video):
+        """Identify a job by its input file's identity and the analysis settings."""
+        stat = os.stat(input_video)
+        params = [os.path.abspath(input_video), stat.st_size, stat.st_mtime_ns,
+                  self.threshold, self.chunk_size, self.merge_threshold, self.fps]
+        return hashlib.md5(json.dumps(params).encode()).hexdigest()
+
+    def output_file(self, input_video):
+        name = os.path.splitext(os.path.basename(input_video))[0]
+        return os.path.join(self.output_dir, name + '.mlt')
+
+    def completed(self):
+        """Ids of jobs whose last logged status is 'done' and whose output exists."""
+        last = {}
+        if os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # line cut short by a crash
+                    last[record['job']] = record
+        return {job for job, record in last.items()
+                if record['status'] == 'done' and os.path.exists(record['output'])}
+
+    def log(self, job, status, **fields):
+        record = {'job': job['id'], 'input': job['input'], 'output': job['output'], 'status': status,
+                  'time': time.time(), **fields}
+        with open(self.log_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def run(self, inputs):
+        """Process every input; ``inputs`` may be an endless iterator yielding None when idle."""
+        done = self.completed()
+        pending = {}
+        inputs = iter(inputs)
+        exhausted = False
+        summary = {'done': 0, 'failed': 0, 'skipped': 0}
+
+        # Analysis workers are spawned, not forked, since decoder threads are already running
+        with tempfile.TemporaryDirectory() as scratch, ThreadPoolExecutor(self.decode_workers) as decoders, \
+                ProcessPoolExecutor(self.analysis_workers, multiprocessing.get_context('spawn')) as analyzers:
+            while True:
+                while not exhausted and len(pending) < self.max_pending:
+                    try:
+                        input_video = next(inputs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if input_video is None:
+                        break
+                    job = {'id': None, 'input': input_video, 'output': self.output_file(input_video)}
+                    try:
+                        job['id'] = self.job_id(input_video)
+                    except OSError as error:
+                        self.log(job, 'failed', stage='queue', error=f"{type(error).__name__}: {error}")
+                        summary['failed'] += 1
+                        continue
+                    if job['id'] in done:
+                        summary['skipped'] += 1
+                        continue
+                    done.add(job['id'])
+                    job['started'] = time.perf_counter()
+                    self.log(job, 'decoding')
+                    future = decoders.submit(decode_job, input_video, self.chunk_size, self.fps, self.cache_dir,
+                                             os.path.join(scratch, job['id'] + '.pcm'))
+                    pending[future] = ('decode', job)
+
+                if not pending:
+                    if exhausted:
+                        break
+                    continue
+
+                finished, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, job = pending.pop(future)
+                    elapsed = time.perf_counter() - job['started']
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        self.log(job, 'failed', stage=stage, error=f"{type(error).__name__}: {error}",
+                                 elapsed=elapsed)
+                        summary['failed'] += 1
+                        continue
+                    if stage == 'decode':
+                        job['decode_seconds'] = elapsed
+                        self.log(job, 'analyzing', decode_seconds=elapsed)
+                        future = analyzers.submit(analyze_job, result, job['input'], job['output'],
+                                                  self.threshold, self.merge_threshold, self.chunk_size, self.fps,
+                                                  self.cache_dir)
+                        pending[future] = ('analyze', job)
+                    else:
+                        self.log(job, 'done', decode_seconds=job['decode_seconds'],
+                                 analysis_seconds=elapsed - job['decode_seconds'], elapsed=elapsed, **result)
+                        summary['done'] += 1
+        return summary
+
+
+def watch_folder(input_dir, patterns=VIDEO_PATTERNS, interval=5.0):
+    """Yield new recordings in input_dir forever, once their size and mtime stop changing.
+
+    Yields None after every scan so the caller can service running jobs.
+    """
+    seen = set()
+    last_stat = {}
+    while True:
+        for pattern in patterns:
+            for path in sorted(glob.glob(os.path.join(input_dir, pattern))):
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                ident = (path, stat.st_size, stat.st_mtime_ns)
+                if ident in seen:
+                    continue
+                # Only pick a file up once it looked the same on two scans in a row
+                if last_stat.get(path) == ident:
+                    seen.add(ident)
+                    yield path
+                last_stat[path] = ident
+        yield None
+        time.sleep(interval)
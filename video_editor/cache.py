@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .audio import DEFAULT_FPS
+from .envelope import Envelope, compute_envelope
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'video-editor')
+DEFAULT_MAX_BYTES = 1 << 30
+
+HASH_BLOCK = 1 << 20
+
+
+def media_hash(filename):
+    """MD5 of the first and last MiB of a file, the same sample Shotcut uses for shotcut:hash."""
+    digest = hashlib.md5()
+    with open(filename, 'rb') as f:
+        digest.update(f.read(HASH_BLOCK))
+        size = f.seek(0, os.SEEK_END)
+        if size > HASH_BLOCK:
+            f.seek(max(HASH_BLOCK, size - HASH_BLOCK))
+            digest.update(f.read(HASH_BLOCK))
+    return digest.hexdigest()
+
+
+def _write_atomic(path, write):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class EnvelopeCache:
+    """On-disk cache of computed envelopes, loaded back as memory-mapped float32.
+
+    Entries are keyed by the media hash and file size plus the analysis
+    parameters and remember the size and mtime of the file they were
+    computed from; an entry whose source changed is dropped on lookup. Hits
+    refresh the entry's mtime and the least recently used entries are
+    evicted once the directory grows past max_bytes. Decoded PCM stores
+    (see pcm.PcmStore) are kept as entries of the same kind.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.environ.get('VIDEO_EDITOR_CACHE', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._hashes = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def media_hash(self, filename):
+        """media_hash() of filename, recomputed only when its size or mtime changes."""
+        stat = os.stat(filename)
+        ident = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+        if ident not in self._hashes:
+            self._hashes[ident] = media_hash(filename)
+        return self._hashes[ident]
+
+    def media_id(self, filename):
+        """Hash and size of filename; recordings sharing their first and last MiB still differ in size."""
+        return [self.media_hash(filename), os.path.getsize(filename)]
+
+    def key(self, filename, chunk_size, fps, metric, analysis_fps, stream=None):
+        params = [*self.media_id(filename), chunk_size, fps, metric, analysis_fps or fps]
+        if stream is not None:
+            params.append(stream)
+        return hashlib.md5(json.dumps(params).encode()).hexdigest()
+
+    def pcm_key(self, filename, rate, channels, stream=None):
+        params = ['pcm', *self.media_id(filename), rate, channels]
+        if stream is not None:
+            params.append(stream)
+        return hashlib.md5(json.dumps(params).encode()).hexdigest()
+
+    def _paths(self, key, suffix='.npy'):
+        base = os.path.join(self.cache_dir, key)
+        return base + suffix, base + '.json'
+
+    def _read_meta(self, filename, data_path, meta_path):
+        """An entry's metadata, or None (dropping the entry) when its source file has changed."""
+        with open(meta_path) as f:
+            meta = json.load(f)
+        stat = os.stat(filename)
+        if (meta['size'], meta['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            self._remove(data_path, meta_path)
+            return None
+        return meta
+
+    def _write_meta(self, filename, meta_path, **meta):
+        stat = os.stat(filename)
+        meta = {'source': os.path.abspath(filename), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **meta}
+        _write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode()))
+
+    def get(self, filename, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude', analysis_fps=None, stream=None):
+        """Return the cached Envelope for these parameters, or None."""
+        data_path, meta_path = self._paths(self.key(filename, chunk_size, fps, metric, analysis_fps, stream))
+        try:
+            meta = self._read_meta(filename, data_path, meta_path)
+            if meta is None:
+                return None
+            means = np.load(data_path, mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(data_path)
+        return Envelope(means, chunk_size, fps, metric, meta['analysis_fps'], meta['nsamples'])
+
+    def put(self, filename, envelope, stream=None):
+        """Store an envelope computed from filename and evict old entries if needed."""
+        key = self.key(filename, envelope.chunk_size, envelope.fps, envelope.metric, envelope.analysis_fps, stream)
+        data_path, meta_path = self._paths(key)
+        _write_atomic(data_path, lambda f: np.save(f, np.asarray(envelope.means, dtype=np.float32)))
+        self._write_meta(filename, meta_path, analysis_fps=envelope.analysis_fps, nsamples=envelope.nsamples)
+        self.evict()
+
+    def load_or_compute(self, filename, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude', analysis_fps=None,
+                        stream=None, pcm=None):
+        """Return the cached envelope, decoding and caching it on a miss.
+
+        With a PcmStore as ``pcm``, a miss is computed from it (at its rate)
+        instead of decoding the file again.
+        """
+        if pcm is not None:
+            analysis_fps = pcm.rate
+        envelope = self.get(filename, chunk_size, fps, metric, analysis_fps, stream)
+        if envelope is None:
+            envelope = compute_envelope(filename, chunk_size, fps, metric, analysis_fps, stream=stream, pcm=pcm)
+            self.put(filename, envelope, stream)
+        return envelope
+
+    def get_pcm(self, filename, rate, channels, stream=None):
+        """Return the cached PcmStore of filename's audio, or None."""
+        from .pcm import PcmStore
+
+        data_path, meta_path = self._paths(self.pcm_key(filename, rate, channels, stream), '.pcm')
+        try:
+            if self._read_meta(filename, data_path, meta_path) is None:
+                return None
+            store = PcmStore(data_path)
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(data_path)
+        return store
+
+    def load_or_decode_pcm(self, filename, rate, channels, stream=None):
+        """Return the cached PcmStore, decoding the audio into the cache on a miss."""
+        return self.load_or_decode_pcms(filename, [(rate, channels)], stream)[0]
+
+    def load_or_decode_pcms(self, filename, formats, stream=None):
+        """Return a cached PcmStore per (rate, channels), decoding the missing ones together."""
+        from .pcm import write_pcm_stores
+
+        stores = [self.get_pcm(filename, rate, channels, stream) for rate, channels in formats]
+        missing = [i for i, store in enumerate(stores) if store is None]
+        if missing:
+            paths = [self._paths(self.pcm_key(filename, *formats[i], stream), '.pcm') for i in missing]
+            try:
+                written = write_pcm_stores(filename, [(data_path, *formats[i])
+                                                      for i, (data_path, _) in zip(missing, paths)], stream)
+            except BaseException:
+                for store in stores:
+                    if store is not None:
+                        store.close()
+                raise
+            for i, store, (_, meta_path) in zip(missing, written, paths):
+                stores[i] = store
+                rate, channels = formats[i]
+                self._write_meta(filename, meta_path, rate=rate, channels=channels)
+            # The new stores are open, so they stay even when they alone exceed max_bytes
+            self.evict()
+        return stores
+
+    def entries(self):
+        """(mtime, size, data_path, meta_path) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            base, suffix = os.path.splitext(name)
+            if suffix not in ('.npy', '.pcm'):
+                continue
+            data_path, meta_path = self._paths(base, suffix)
+            try:
+                stat = os.stat(data_path)
+                size = stat.st_size + os.path.getsize(meta_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, size, data_path, meta_path))
+        return sorted(entries)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes.
+
+        PCM stores still open in this process, which renderer workers may be
+        about to map again, are never dropped.
+        """
+        from .pcm import open_store_paths
+
+        in_use = open_store_paths()
+        entries = self.entries()
+        total = sum(entry[1] for entry in entries)
+        for _, size, data_path, meta_path in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.abspath(data_path) in in_use:
+                continue
+            self._remove(data_path, meta_path)
+            total -= size
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def detect_silence_cached(filename, threshold=0.01, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude',
+                          analysis_fps=None, cache_dir=None):
+    """Detect silence from a cached envelope, decoding the file only on a cache miss.
+
+    Returns the silent intervals and the audio duration in seconds.
+    """
+    envelope = EnvelopeCache(cache_dir).load_or_compute(filename, chunk_size, fps, metric, analysis_fps)
+    starts, ends = envelope.silent_runs(threshold)
+    return list(zip(starts.tolist(), ends.tolist())), envelope.duration
@@ -0,0 +1,340 @@
+"""Command line interface: ``video-editor`` / ``python -m video_editor``.
+
+Only argparse is imported up front; every command imports the modules it
+needs when it runs, so ``--help`` stays fast.
+"""
+import argparse
+import sys
+
+# Mirrors detection.METRICS / DETECTORS, pipeline.EXPORT_MODES, export.EXPORTERS and
+# timecode.PROFILE_FRAME_RATES without importing them
+METRICS = ('magnitude', 'rms', 'db')
+ENGINES = ('threshold', 'hysteresis')
+AUTO_THRESHOLDS = ('otsu', 'gmm')
+EXPORT_MODES = ('reencode', 'sequential', 'parallel', 'keyframe', 'smart')
+EXPORT_FORMATS = ('mlt', 'edl', 'fcpxml', 'concat', 'filter', 'json')
+PROFILES = ('hdv_720_25p', 'hdv_720_30p', 'hdv_720_50p', 'hdv_720_60p', 'atsc_1080p_2398', 'atsc_1080p_24',
+            'atsc_1080p_25', 'atsc_1080p_2997', 'atsc_1080p_30', 'atsc_1080p_50', 'atsc_1080p_5994',
+            'atsc_1080p_60')
+
+
+def threshold_value(value):
+    """A fixed threshold, or the name of a method that picks one per recording."""
+    if value in AUTO_THRESHOLDS:
+        return value
+    try:
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or one of {', '.join(AUTO_THRESHOLDS)}") from None
+
+
+def add_detection_arguments(parser, sweep=False):
+    if not sweep:
+        parser.add_argument('--threshold', type=threshold_value, default=0.01,
+                            help="silence level, or 'otsu' / 'gmm' to pick it from the level histogram")
+        parser.add_argument('--chunk-size', type=int, default=100, help="window length in samples")
+        parser.add_argument('--merge-threshold', type=float, default=0.0,
+                            help="merge silent runs separated by at most this many seconds")
+        parser.add_argument('--pre-roll', type=float, default=0.0, help="seconds kept before each voiced section")
+        parser.add_argument('--post-roll', type=float, default=0.0, help="seconds kept after each voiced section")
+        parser.add_argument('--min-keep', type=float, default=0.0, help="drop voiced sections shorter than this")
+        parser.add_argument('--min-cut', type=float, default=0.0, help="keep silent gaps shorter than this")
+        parser.add_argument('--engine', choices=ENGINES, default='threshold',
+                            help="'hysteresis' uses --threshold to switch voice on and --off-threshold to "
+                                 "switch it off")
+        parser.add_argument('--off-threshold', type=float, help="default: half of --threshold (6 dB below for db)")
+        parser.add_argument('--attack', type=float, default=0.05, help="ignore voiced bursts shorter than this")
+        parser.add_argument('--release', type=float, default=0.2, help="hold voice this long after it drops")
+        parser.add_argument('--adaptive', action='store_true',
+                            help="raise the thresholds above a running noise floor")
+        parser.add_argument('--floor-percentile', type=float, default=10)
+        parser.add_argument('--floor-window', type=float, default=10.0, help="seconds the noise floor spans")
+    parser.add_argument('--metric', choices=METRICS, default='magnitude')
+    parser.add_argument('--fps', type=int, default=44100, help="rate chunk sizes are counted at")
+    parser.add_argument('--analysis-fps', type=int,
+                        help="decode at this rate for analysis (e.g. 16000); not faster, and the threshold "
+                             "needs retuning since levels lose the band above half this rate")
+    parser.add_argument('--cache-dir', help="reuse envelopes cached in this directory")
+    parser.add_argument('--profile', choices=PROFILES, default='hdv_720_25p',
+                        help="MLT profile whose frame rate cuts are snapped to")
+
+
+def add_profiling_arguments(parser):
+    parser.add_argument('--report', metavar='PATH',
+                        help="time every stage and write a JSON report of timings, counters and peak memory")
+    parser.add_argument('--cprofile', metavar='PATH', help="also write cProfile stats of the run to PATH")
+
+
+def detection_options(args):
+    engine_options = {}
+    if args.engine == 'hysteresis':
+        engine_options = {'off_threshold': args.off_threshold, 'attack': args.attack, 'release': args.release,
+                          'adaptive': args.adaptive, 'floor_percentile': args.floor_percentile,
+                          'floor_window': args.floor_window}
+    return {'metric': args.metric, 'fps': args.fps, 'analysis_fps': args.analysis_fps, 'profile': args.profile,
+            'pre_roll': args.pre_roll, 'post_roll': args.post_roll, 'min_keep': args.min_keep,
+            'min_cut': args.min_cut, 'engine': args.engine, 'engine_options': engine_options}
+
+
+def cmd_mlt(args):
+    if args.incremental:
+        if args.engine != 'threshold' or args.cache_dir:
+            raise ValueError("--incremental works with the threshold engine and without --cache-dir.")
+        from .incremental import update_project
+
+        voiced, decoded = update_project(args.input, args.output, args.threshold, args.chunk_size,
+                                         args.merge_threshold, args.metric, args.fps, args.analysis_fps,
+                                         args.profile, args.pre_roll, args.post_roll, args.min_keep, args.min_cut)
+        print(f"Wrote {len(voiced)} sections to {args.output} ({decoded:.1f}s of new audio analyzed)")
+        return
+
+    from .pipeline import generate_shotcut_project
+
+    sections, threshold = generate_shotcut_project(args.input, args.output, args.threshold, args.chunk_size,
+                                                   args.merge_threshold, args.cache_dir, profiler=args.profiler,
+                                                   **detection_options(args))
+    print(f"Wrote {len(sections)} sections to {args.output} (threshold {threshold:.6g})")
+
+
+def cmd_export(args):
+    from .export import export_cut_list
+
+    if args.input.lower().endswith('.json'):
+        # A saved cut list: export it again without touching the audio
+        from .cutlist import CutList
+        cut_list = CutList.load(args.input)
+    else:
+        from .pipeline import detect_cut_list
+        cut_list = detect_cut_list(args.input, args.threshold, args.chunk_size, args.merge_threshold,
+                                   args.cache_dir, profiler=args.profiler, **detection_options(args))
+    for output in args.outputs:
+        fmt = export_cut_list(cut_list, output, args.format)
+        print(f"Wrote {len(cut_list)} sections to {output} ({fmt})")
+
+
+def cmd_render(args):
+    from .pipeline import remove_silence
+
+    # The rendered video keeps the input's frame rate, so the MLT profile does not apply
+    options = detection_options(args)
+    del options['profile']
+    sections, threshold = remove_silence(args.input, args.output, args.threshold, args.chunk_size,
+                                         args.merge_threshold, args.mode, args.workers, args.preset, args.cache_dir,
+                                         profiler=args.profiler, pcm_store=args.pcm_store, **options)
+    print(f"Rendered {len(sections)} sections to {args.output} (threshold {threshold:.6g})")
+
+
+def cmd_sweep(args):
+    import json
+    import math
+    import os
+    import time
+    from functools import reduce
+
+    from .sweep import mlt_filename, sweep
+    from .timecode import profile_frame_rate, samples_to_frames
+
+    started = time.perf_counter()
+    base_chunk = reduce(math.gcd, args.chunk_sizes)
+    if args.cache_dir:
+        from .cache import EnvelopeCache
+        envelope = EnvelopeCache(args.cache_dir).load_or_compute(args.input, base_chunk, args.fps,
+                                                                 args.metric, args.analysis_fps)
+    else:
+        from .envelope import compute_envelope
+        envelope = compute_envelope(args.input, base_chunk, args.fps, args.metric, args.analysis_fps)
+    print(f"Loaded {envelope.duration:.1f}s into {len(envelope)} windows in {time.perf_counter() - started:.2f}s")
+
+    if args.mlt_dir:
+        from .mlt import write_mlt
+        os.makedirs(args.mlt_dir, exist_ok=True)
+
+    print(f"{'threshold':>10} {'chunk':>6} {'merge':>6} {'kept s':>9} {'cuts':>6} {'shortest s':>11} {'ms':>7}")
+    report = []
+    started = time.perf_counter()
+    length = samples_to_frames(envelope.nsamples, envelope.analysis_fps, profile_frame_rate(args.profile))
+    for result in sweep(envelope, args.thresholds, args.chunk_sizes, args.merge_thresholds, args.profile):
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{result['threshold']:>10g} {result['chunk_size']:>6} {result['merge_threshold']:>6g} "
+              f"{result['kept_duration']:>9.2f} {result['cut_count']:>6} {result['shortest_segment']:>11.3f} "
+              f"{elapsed:>7.2f}")
+        if args.mlt_dir:
+            write_mlt(os.path.join(args.mlt_dir, mlt_filename(result)), args.input,
+                      result['voiced_frames'], int(length), args.profile,
+                      {'video_editor:threshold': f"{result['threshold']:.6g}"})
+        report.append({key: value for key, value in result.items()
+                       if key not in ('voiced_frames', 'voiced_sections')})
+        started = time.perf_counter()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+def cmd_multitrack(args):
+    from .multitrack import generate_multitrack_project
+
+    sections, thresholds = generate_multitrack_project(args.tracks, args.output, args.threshold, args.chunk_size,
+                                                       args.merge_threshold, workers=args.workers,
+                                                       cache_dir=args.cache_dir, profiler=args.profiler,
+                                                       **detection_options(args))
+    used = ', '.join(f'{threshold:.6g}' for threshold in thresholds)
+    print(f"Wrote {len(sections)} sections of {len(args.tracks)} tracks to {args.output} (thresholds {used})")
+
+
+def cmd_batch(args):
+    from .batch import BatchRunner, watch_folder
+
+    runner = BatchRunner(args.output_dir, args.log, args.threshold, args.chunk_size, args.merge_threshold,
+                         fps=args.fps, decode_workers=args.decode_workers, analysis_workers=args.analysis_workers,
+                         max_pending=args.max_pending, cache_dir=args.cache_dir)
+    if args.batch_command == 'run':
+        print(runner.run(args.inputs))
+    else:
+        try:
+            runner.run(watch_folder(args.input_dir, interval=args.interval))
+        except KeyboardInterrupt:
+            pass
+
+
+def cmd_live(args):
+    from .live import LiveDetector, open_pcm_stream, run_live
+
+    stream = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    with stream:
+        reader, rate, channels = open_pcm_stream(stream, args.rate, args.channels)
+        detector = LiveDetector(args.threshold, args.chunk_size, args.fps, args.metric, rate, args.lookahead,
+                                args.min_cut)
+        frame_samples = max(1, round(args.frame_ms * rate / 1000))
+        resource = args.resource or ('capture' if args.input == '-' else args.input)
+        run_live(reader, rate, channels, detector, frame_samples, args.realtime, mlt_path=args.mlt,
+                 resource=resource, profile=args.profile)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='video-editor', description="Remove silence from recordings.")
+    parser.add_argument('--version', action='store_true', help="print the version and exit")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    mlt = commands.add_parser('mlt', help="write a Shotcut (MLT) project keeping the voiced sections")
+    mlt.add_argument('input')
+    mlt.add_argument('output')
+    add_detection_arguments(mlt)
+    add_profiling_arguments(mlt)
+    mlt.add_argument('--incremental', action='store_true',
+                     help="keep state next to OUTPUT and only analyze audio appended since the last run")
+    mlt.set_defaults(func=cmd_mlt)
+
+    export = commands.add_parser('export', help="write the cut list of a recording in one or more formats")
+    export.add_argument('input', help="media file to analyze, or a cut list saved as .json (no analysis)")
+    export.add_argument('outputs', nargs='+', metavar='OUTPUT',
+                        help="format by extension: .mlt .edl .fcpxml .ffconcat/.txt (ffmpeg concat) "
+                             ".filter (ffmpeg filter script) .json")
+    export.add_argument('--format', choices=EXPORT_FORMATS, help="format of every OUTPUT, whatever its extension")
+    add_detection_arguments(export)
+    add_profiling_arguments(export)
+    export.set_defaults(func=cmd_export)
+
+    render = commands.add_parser('render', help="render a video with the silent sections removed")
+    render.add_argument('input')
+    render.add_argument('output')
+    add_detection_arguments(render)
+    add_profiling_arguments(render)
+    render.add_argument('--mode', choices=EXPORT_MODES, default='reencode')
+    render.add_argument('--workers', type=int, help="worker processes for --mode parallel")
+    render.add_argument('--preset', default='medium', help="x264 preset")
+    render.add_argument('--pcm-store', action='store_true',
+                        help="decode the audio once into memory-mapped PCM files for the analysis and the "
+                             "renderer (kept in --cache-dir when given); not with --mode reencode")
+    render.set_defaults(func=cmd_render)
+
+    multitrack = commands.add_parser('multitrack',
+                                     help="cut several tracks together, keeping what any of them is voiced in")
+    multitrack.add_argument('output')
+    multitrack.add_argument('tracks', nargs='+', metavar='TRACK',
+                            help="media file, or FILE:N for its N-th audio stream")
+    add_detection_arguments(multitrack)
+    add_profiling_arguments(multitrack)
+    multitrack.add_argument('--workers', type=int, help="tracks analyzed at once (default: all)")
+    multitrack.set_defaults(func=cmd_multitrack)
+
+    sweep = commands.add_parser('sweep', help="evaluate many settings against one decode of a recording")
+    sweep.add_argument('input')
+    sweep.add_argument('--thresholds', type=threshold_value, nargs='+', required=True)
+    sweep.add_argument('--chunk-sizes', type=int, nargs='+', default=[100])
+    sweep.add_argument('--merge-thresholds', type=float, nargs='+', default=[0.0])
+    add_detection_arguments(sweep, sweep=True)
+    sweep.add_argument('--mlt-dir', help="write one MLT project per combination into this directory")
+    sweep.add_argument('--json', help="write the results (without sections) to this file")
+    sweep.set_defaults(func=cmd_sweep)
+
+    live = commands.add_parser('live', help="detect silence on a live PCM stream and emit keep/cut events as JSONL")
+    live.add_argument('input', nargs='?', default='-',
+                      help="WAV or raw s16le PCM from a file, a named FIFO, or - for stdin (default)")
+    live.add_argument('--rate', type=int, default=16000, help="sample rate of raw input")
+    live.add_argument('--channels', type=int, default=1, help="channel count of raw input")
+    live.add_argument('--threshold', type=float, default=0.01)
+    live.add_argument('--chunk-size', type=int, default=100, help="window length in samples at --fps")
+    live.add_argument('--fps', type=int, default=44100, help="rate chunk sizes are counted at")
+    live.add_argument('--metric', choices=METRICS, default='magnitude')
+    live.add_argument('--lookahead', type=float, default=0.5, help="seconds each decision waits for (its latency)")
+    live.add_argument('--min-cut', type=float, help="shortest silence that is cut (default: the lookahead)")
+    live.add_argument('--frame-ms', type=float, default=20.0, help="read size in milliseconds")
+    live.add_argument('--realtime', action='store_true', help="pace file input at its own sample rate")
+    live.add_argument('--mlt', help="keep an MLT project of the kept segments up to date at this path")
+    live.add_argument('--resource', help="media file the MLT project refers to (default: INPUT)")
+    live.add_argument('--profile', choices=PROFILES, default='hdv_720_25p')
+    live.set_defaults(func=cmd_live)
+
+    batch = commands.add_parser('batch', help="process many recordings, once or as a watch-folder service")
+    batch_commands = batch.add_subparsers(dest='batch_command', required=True)
+    batch_run = batch_commands.add_parser('run', help="process the given recordings and exit")
+    batch_run.add_argument('inputs', nargs='+')
+    batch_watch = batch_commands.add_parser('watch', help="keep processing recordings dropped into a folder")
+    batch_watch.add_argument('input_dir')
+    batch_watch.add_argument('--interval', type=float, default=5.0)
+    for sub in (batch_run, batch_watch):
+        sub.add_argument('--output-dir', required=True)
+        sub.add_argument('--log', help="JSONL status log (default: OUTPUT_DIR/jobs.jsonl)")
+        sub.add_argument('--threshold', type=threshold_value, default=0.01)
+        sub.add_argument('--chunk-size', type=int, default=100)
+        sub.add_argument('--merge-threshold', type=float, default=0.0)
+        sub.add_argument('--fps', type=int, default=44100)
+        sub.add_argument('--decode-workers', type=int, default=2)
+        sub.add_argument('--analysis-workers', type=int)
+        sub.add_argument('--max-pending', type=int)
+        sub.add_argument('--cache-dir')
+    batch.set_defaults(func=cmd_batch)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.version:
+        from . import __version__
+        print(__version__)
+        return 0
+    if not args.command:
+        parser.print_help()
+        return 2
+    report, cprofile = getattr(args, 'report', None), getattr(args, 'cprofile', None)
+    args.profiler = None
+    if report or cprofile:
+        from .profiling import Profiler
+        args.profiler = Profiler(cprofile=bool(cprofile))
+    try:
+        if args.profiler:
+            with args.profiler:
+                args.func(args)
+        else:
+            args.func(args)
+    except (IOError, ValueError) as error:
+        print(f"video-editor: error: {error}", file=sys.stderr)
+        return 1
+    if report:
+        args.profiler.write_report(report)
+    if cprofile:
+        args.profiler.dump_cprofile(cprofile)
+    return 0
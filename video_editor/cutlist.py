@@ -0,0 +1,94 @@
+"""The result of detection in a form no editor owns: what to keep of which source, in frames.
+
+A CutList is produced once and handed to any of the exporters in
+video_editor.export (MLT, EDL, FCPXML, ffmpeg, JSON); its JSON form can be
+loaded back, so switching targets never needs the audio analyzed again.
+"""
+import json
+import os
+
+from .intervals import IntervalSet
+from .timecode import DEFAULT_PROFILE, frames_to_seconds, profile_frame_rate, samples_to_frames
+
+FORMAT_VERSION = 1
+
+
+class CutList:
+    """Kept sections of one source as an IntervalSet of frames at an MLT profile's rate.
+
+    ``length`` is the source length in frames (None when unknown) and
+    ``properties`` free-form name/value pairs about how the cuts were made
+    (threshold, method, ...). ``source_frame_rate`` (num, den) and
+    ``source_size`` (width, height) describe the source's own video, for the
+    formats that address its frames rather than an MLT timeline's; None when
+    unknown, in which case the profile stands in for them.
+    """
+
+    def __init__(self, source, keep, length=None, profile=DEFAULT_PROFILE, properties=None, source_frame_rate=None,
+                 source_size=None):
+        self.source = source
+        self.keep = keep if isinstance(keep, IntervalSet) else IntervalSet.from_pairs(keep)
+        self.length = length
+        self.profile = profile
+        self.properties = dict(properties or {})
+        self.source_frame_rate = tuple(source_frame_rate) if source_frame_rate else None
+        self.source_size = tuple(source_size) if source_size else None
+
+    @property
+    def frame_rate(self):
+        return profile_frame_rate(self.profile)
+
+    def __len__(self):
+        return len(self.keep)
+
+    def sections(self):
+        """Kept (start, end) pairs in seconds."""
+        return self.keep.to_seconds(self.frame_rate)
+
+    def source_frames(self):
+        """(keep, length, frame_rate) snapped to the source's own frames.
+
+        Each profile frame boundary moves to the nearest source frame; with
+        the source rate unknown or equal to the profile's, nothing changes.
+        """
+        rate = self.source_frame_rate
+        if rate is None or rate == self.frame_rate:
+            return self.keep, self.length, self.frame_rate
+        num, den = self.frame_rate
+        # Profile frame f is f * den samples at num samples per second
+        keep = IntervalSet(self.keep.starts * den, self.keep.ends * den).to_frames(num, rate)
+        length = None if self.length is None else int(samples_to_frames(self.length * den, num, rate))
+        return keep, length, rate
+
+    def cuts(self):
+        """The removed stretches as an IntervalSet of frames (needs the length)."""
+        if self.length is None:
+            raise ValueError("The source length is unknown.")
+        return self.keep.complement(self.length)
+
+    def kept_duration(self):
+        return float(frames_to_seconds(self.keep.total(), self.frame_rate))
+
+    def to_dict(self):
+        num, den = self.frame_rate
+        return {'version': FORMAT_VERSION, 'source': os.path.abspath(self.source), 'profile': self.profile,
+                'frame_rate': [num, den], 'length': self.length, 'properties': self.properties,
+                'keep': [list(pair) for pair in self.keep], 'keep_seconds': [list(pair) for pair in self.sections()],
+                'source_frame_rate': list(self.source_frame_rate) if self.source_frame_rate else None,
+                'source_size': list(self.source_size) if self.source_size else None}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cut list version: {data.get('version')!r}")
+        return cls(data['source'], data['keep'], data['length'], data['profile'], data['properties'],
+                   data.get('source_frame_rate'), data.get('source_size'))
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,522 @@
+import numpy as np
+
+from .audio import DEFAULT_FPS, iter_pcm_blocks
+from .intervals import IntervalSet
+from .profiling import NULL_PROFILER
+
+
+def chunk_boundaries(total_samples, chunk_size):
+    """Sample offsets of the analysis windows, laid out like AudioClip.iter_chunks."""
+    nchunks = total_samples // chunk_size + 1
+    return np.linspace(0, total_samples, nchunks + 1, endpoint=True, dtype=int)
+
+
+def window_magnitudes(samples, offsets):
+    """Mean absolute amplitude of each window starting at the given offsets.
+
+    ``samples`` is a (n,) or (n, channels) array and ``offsets`` the start of
+    every window inside it; the last window runs to the end of the array.
+    """
+    samples = np.abs(samples)
+    channels = 1
+    if samples.ndim == 2:
+        channels = samples.shape[1]
+        samples = samples.sum(axis=1)
+    sizes = np.diff(np.append(offsets, len(samples)))
+    sums = np.add.reduceat(samples, offsets) if len(samples) else np.zeros(len(offsets))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / (sizes * channels)
+
+
+METRICS = ('magnitude', 'rms', 'db')
+
+
+def sample_levels(samples, metric='magnitude'):
+    """Per-sample quantity that gets averaged over each window for a metric.
+
+    'magnitude' is |x| (the scripts' default), 'rms' averages x**2 and 'db'
+    is 20*log10|x|, the loudness measure used by convert_to_mlt_4.
+    """
+    if metric == 'rms':
+        return np.square(samples, dtype=np.float64)
+    samples = np.abs(samples)
+    if metric == 'magnitude':
+        return samples
+    if metric == 'db':
+        return 20 * np.log10(np.maximum(samples, 1e-10))  # Avoid log of zero
+    raise ValueError(f"Unknown metric: {metric!r}")
+
+
+def window_levels(means, metric='magnitude'):
+    """Turn per-window means of sample_levels into levels comparable to a threshold."""
+    if metric == 'rms':
+        return np.sqrt(means)
+    return np.asarray(means)
+
+
+AUTO_THRESHOLDS = ('otsu', 'gmm')
+
+
+def otsu_boundary(counts, edges):
+    """Histogram edge that maximizes the between-class variance (Otsu's method).
+
+    When every count falls in one bin there is nothing to split, and the
+    lower edge of that bin is returned so that no value falls below it.
+    """
+    occupied = np.flatnonzero(counts)
+    if len(occupied) < 2:
+        return edges[occupied[0] if len(occupied) else 0]
+    centers = (edges[:-1] + edges[1:]) / 2
+    w0 = np.cumsum(counts)[:-1]
+    w1 = counts.sum() - w0
+    m0 = np.cumsum(counts * centers)[:-1]
+    m1 = (counts * centers).sum() - m0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        between = w0 * w1 * (m0 / w0 - m1 / w1) ** 2
+    return edges[np.nanargmax(between) + 1]
+
+
+def gmm_boundary(counts, edges, iterations=100):
+    """Boundary between two Gaussians fitted to a histogram by EM.
+
+    Starts from the Otsu split and returns the point between the two means
+    where the weighted densities cross.
+    """
+    centers = (edges[:-1] + edges[1:]) / 2
+    split = otsu_boundary(counts, edges)
+    resp = np.stack((centers < split, centers >= split)).astype(np.float64)
+    floor = (edges[1] - edges[0]) ** 2
+    for _ in range(iterations):
+        weights = resp * counts
+        totals = weights.sum(axis=1)
+        if not totals.all():
+            return split
+        means = (weights * centers).sum(axis=1) / totals
+        variances = np.maximum((weights * (centers - means[:, None]) ** 2).sum(axis=1) / totals, floor)
+        log_density = (np.log(totals) - 0.5 * np.log(variances))[:, None] \
+            - (centers - means[:, None]) ** 2 / (2 * variances[:, None])
+        resp = np.exp(log_density - log_density.max(axis=0))
+        resp /= resp.sum(axis=0)
+    grid = np.linspace(means[0], means[1], 1024)
+    ratio = (np.log(totals) - 0.5 * np.log(variances))[:, None] \
+        - (grid - means[:, None]) ** 2 / (2 * variances[:, None])
+    crossing = np.flatnonzero(ratio[1] >= ratio[0])
+    return grid[crossing[0]] if len(crossing) else split
+
+
+def auto_threshold(levels, method='otsu', metric='magnitude', bins=256):
+    """Pick the silence/speech boundary from a histogram of window levels.
+
+    The histogram is built on a dB scale, where background noise and speech
+    form two separate humps, and split with Otsu's method ('otsu') or a
+    two-Gaussian fit ('gmm'). Returns a threshold on the metric's own scale;
+    levels that are all the same give a threshold at that level, so nothing
+    counts as silence.
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    values = levels if metric == 'db' else 20 * np.log10(np.maximum(levels, 1e-6))
+    finite = np.isfinite(values)
+    values = np.maximum(values[finite], -120)
+    if not len(values):
+        raise ValueError("Cannot pick a threshold without any audio.")
+    if values.min() == values.max():
+        return float(levels[finite].min())
+    counts, edges = np.histogram(values, bins)
+    if method == 'otsu':
+        boundary = otsu_boundary(counts, edges)
+    elif method == 'gmm':
+        boundary = gmm_boundary(counts, edges)
+    else:
+        raise ValueError(f"Unknown threshold method: {method!r}")
+    return float(boundary if metric == 'db' else 10 ** (boundary / 20))
+
+
+def mask_runs(mask):
+    """Return (starts, ends) indices of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def silent_runs(magnitudes, threshold):
+    """Return (starts, ends) window indices of consecutive windows below threshold."""
+    return mask_runs(magnitudes < threshold)
+
+
+def _buffered_windows(reader, bounds, first, last):
+    """How many windows from ``first`` (up to ``last``) a MoviePy reader serves from its current buffer.
+
+    Always at least one: a window that needs a refill is read on its own,
+    exactly like iter_chunks reads it, so the refill happens at the same
+    frame and the reader's state never drifts from the per-chunk loop.
+    """
+    buffer = getattr(reader, 'buffer', None)
+    if buffer is None or bounds[first] < reader.buffer_startframe:
+        return 1
+    end = reader.buffer_startframe + len(buffer)
+    return max(1, int(np.searchsorted(bounds[first + 1:last + 1], end, side='right')))
+
+
+def detect_silence(audio_clip, threshold=0.01, chunk_size=100, block_size=None):
+    """Detect silence in audio. Returns list of silent (start, end) intervals.
+
+    The clip is decoded in blocks of whole windows and each block is reduced
+    to one magnitude per window, so consecutive silent windows come back as a
+    single interval instead of one tuple per chunk.
+
+    MoviePy's file reader repeats a sample whenever it refills its buffer,
+    so what it returns depends on where the refills happen. For a clip read
+    straight from its file (such as VideoFileClip(...).audio) every block
+    stops where the reader's buffer does, which decodes the same samples as
+    the iter_chunks loop and gives the same intervals. block_size caps the
+    samples per read.
+    """
+    if audio_clip is None:
+        raise ValueError("The video has no audio track.")
+
+    fps = audio_clip.fps
+    bounds = chunk_boundaries(int(fps * audio_clip.duration), chunk_size)
+    reader = getattr(audio_clip, 'reader', None)
+    if block_size is None:
+        block_size = getattr(reader, 'buffersize', 100000)
+    windows_per_block = max(1, block_size // chunk_size)
+
+    magnitudes = []
+    first = 0
+    while first < len(bounds) - 1:
+        last = min(first + windows_per_block, len(bounds) - 1)
+        if reader is not None:
+            last = first + _buffered_windows(reader, bounds, first, last)
+        tt = (1.0 / fps) * np.arange(bounds[first], bounds[last])
+        block = audio_clip.to_soundarray(tt, fps=fps, buffersize=len(tt))
+        magnitudes.append(window_magnitudes(block, bounds[first:last] - bounds[first]))
+        first = last
+
+    starts, ends = silent_runs(np.concatenate(magnitudes), threshold)
+    step = chunk_size / fps
+    return [(start * step, end * step) for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+class WindowLevels:
+    """Streaming per-window mean of a per-sample level (see sample_levels).
+
+    ``chunk_size`` is counted in samples at ``fps``; when the audio is
+    analyzed at a different ``analysis_fps`` the windows are resized so they
+    still last chunk_size / fps seconds. Only one partial window is kept
+    between blocks.
+    """
+
+    def __init__(self, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude', analysis_fps=None):
+        self.chunk_size = chunk_size
+        self.fps = fps
+        self.analysis_fps = analysis_fps or fps
+        self.metric = metric
+        # Window k starts at analysis sample k * num // den
+        self._num = chunk_size * self.analysis_fps
+        self._den = fps
+        if self._num < self._den:
+            raise ValueError("chunk_size is shorter than one sample at the analysis rate.")
+        self.samples_seen = 0
+        self.windows_seen = 0
+        self._pending = np.empty(-(-self._num // self._den))
+        self._npending = 0
+
+    def feed(self, samples):
+        """Add the next block of samples (int16 PCM or floats in [-1, 1]).
+
+        Returns the means of the windows completed by this block.
+        """
+        if samples.dtype == np.int16:
+            samples = samples * (1.0 / 32768)
+        levels = sample_levels(samples, self.metric)
+        if self._npending:
+            levels = np.concatenate((self._pending[:self._npending], levels))
+        offset = self.samples_seen - self._npending
+        self.samples_seen += len(samples)
+
+        # Start of every window up to the last one that begins inside the
+        # received samples; all windows but that last one are complete
+        last = ((self.samples_seen + 1) * self._den - 1) // self._num
+        bounds = self.window_start(np.arange(self.windows_seen, last + 1)) - offset
+        means = np.empty(0)
+        if len(bounds) > 1:
+            means = np.add.reduceat(levels[:bounds[-1]], bounds[:-1]) / np.diff(bounds)
+            self.windows_seen += len(means)
+        rest = levels[bounds[-1]:]
+
+        self._pending[:len(rest)] = rest
+        self._npending = len(rest)
+        return means
+
+    def finish(self):
+        """Return the mean of the trailing partial window, if there is one."""
+        means = np.empty(0)
+        if self._npending:
+            means = np.array([self._pending[:self._npending].mean()])
+            self.windows_seen += 1
+            self._npending = 0
+        return means
+
+    def window_start(self, index):
+        """First analysis sample of the given window index (or array of indices)."""
+        return np.asarray(index, dtype=np.int64) * self._num // self._den
+
+    def window_time(self, index):
+        """Start of the given window in seconds, clamped to the received audio."""
+        return np.minimum(self.window_start(index), self.samples_seen) / self.analysis_fps
+
+    @property
+    def duration(self):
+        return self.samples_seen / self.analysis_fps
+
+
+class SilenceTracker:
+    """Incremental silence detector fed with consecutive blocks of mono samples.
+
+    Memory stays bounded by one partial window plus the intervals found so
+    far, so blocks can come straight from a decoder pipe. A trailing partial
+    window is evaluated on its own.
+    """
+
+    def __init__(self, threshold=0.01, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude',
+                 analysis_fps=None):
+        self.threshold = threshold
+        self.windows = WindowLevels(chunk_size, fps, metric, analysis_fps)
+        self.run_start = None  # window index where the open silent run began
+        self.silent_samples = []  # (start, end) analysis sample positions
+
+    def feed(self, samples):
+        """Analyze the next block of samples (int16 PCM or floats in [-1, 1])."""
+        self._consume(self.windows.feed(samples))
+
+    def finish(self):
+        """Flush the trailing partial window and close any open silent run."""
+        self._consume(self.windows.finish())
+        if self.run_start is not None:
+            self._close_run(self.run_start, self.windows.windows_seen)
+            self.run_start = None
+        return self.silent_intervals
+
+    def state(self):
+        """Everything needed to resume the tracker later, as JSON-compatible values.
+
+        Taken before finish(), it keeps the open silent run and the samples
+        of the partial window so more audio can be fed after a restart.
+        """
+        windows = self.windows
+        return {
+            'threshold': self.threshold,
+            'chunk_size': windows.chunk_size,
+            'fps': windows.fps,
+            'metric': windows.metric,
+            'analysis_fps': windows.analysis_fps,
+            'samples_seen': windows.samples_seen,
+            'windows_seen': windows.windows_seen,
+            'pending': windows._pending[:windows._npending].tolist(),
+            'run_start': self.run_start,
+            'silent_samples': list(self.silent_samples),
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        tracker = cls(state['threshold'], state['chunk_size'], state['fps'], state['metric'],
+                      state['analysis_fps'])
+        windows = tracker.windows
+        windows.samples_seen = state['samples_seen']
+        windows.windows_seen = state['windows_seen']
+        windows._npending = len(state['pending'])
+        windows._pending[:windows._npending] = state['pending']
+        tracker.run_start = state['run_start']
+        tracker.silent_samples = [tuple(run) for run in state['silent_samples']]
+        return tracker
+
+    @property
+    def silent_intervals(self):
+        """Silent intervals found so far, in seconds."""
+        return [(start / self.analysis_fps, end / self.analysis_fps) for start, end in self.silent_samples]
+
+    @property
+    def samples_seen(self):
+        return self.windows.samples_seen
+
+    @property
+    def analysis_fps(self):
+        return self.windows.analysis_fps
+
+    @property
+    def duration(self):
+        return self.windows.duration
+
+    def _consume(self, means):
+        if not len(means):
+            return
+        end = self.windows.windows_seen
+        base = end - len(means)
+        starts, ends = silent_runs(window_levels(means, self.windows.metric), self.threshold)
+        starts = (starts + base).tolist()
+        ends = (ends + base).tolist()
+
+        # Carry the run left open by the previous block
+        if self.run_start is not None:
+            if starts and starts[0] == base:
+                starts[0] = self.run_start
+            else:
+                self._close_run(self.run_start, base)
+            self.run_start = None
+        if ends and ends[-1] == end:
+            self.run_start = starts.pop()
+            ends.pop()
+
+        for start, end in zip(starts, ends):
+            self._close_run(start, end)
+
+    def _close_run(self, start, end):
+        start, end = np.minimum(self.windows.window_start([start, end]), self.samples_seen).tolist()
+        self.silent_samples.append((start, end))
+
+
+def track_silence_in_file(filename, threshold=0.01, chunk_size=100, fps=DEFAULT_FPS,
+                          metric='magnitude', block_size=1 << 16, analysis_fps=None, stream=None, profiler=None,
+                          pcm=None):
+    """Stream the audio of a media file through a SilenceTracker and return it, finished.
+
+    The tracker's silent_samples hold the silent runs as analysis sample
+    positions, for callers that keep working in integer time. ``stream``
+    picks the N-th audio stream; with a PcmStore as ``pcm`` its samples are
+    read instead, at its rate. With a profiler, waiting for the audio is
+    timed as 'decode' and the window loop as 'windows'.
+    """
+    profiler = profiler or NULL_PROFILER
+    if pcm is not None:
+        tracker = SilenceTracker(threshold, chunk_size, fps, metric, pcm.rate)
+        blocks = pcm.iter_blocks(block_size)
+    else:
+        tracker = SilenceTracker(threshold, chunk_size, fps, metric, analysis_fps)
+        blocks = iter_pcm_blocks(filename, fps=tracker.analysis_fps, block_size=block_size, stream=stream)
+    for block in profiler.timed('decode', blocks):
+        with profiler.stage('windows'):
+            tracker.feed(block)
+    if not tracker.samples_seen:
+        raise ValueError("The video has no audio track.")
+    tracker.finish()
+    profiler.count('samples_decoded', tracker.samples_seen)
+    profiler.count('windows_evaluated', tracker.windows.windows_seen)
+    return tracker
+
+
+def detect_silence_in_file(filename, threshold=0.01, chunk_size=100, fps=DEFAULT_FPS,
+                           metric='magnitude', block_size=1 << 16, analysis_fps=None):
+    """Detect silence straight from a media file without opening a VideoFileClip.
+
+    The audio is streamed from ffmpeg as mono s16 PCM, so peak memory does
+    not depend on the length of the recording. With analysis_fps ffmpeg
+    resamples before analysis and windows keep their length in seconds; it
+    is not faster (the decode dominates and the resampler costs about what
+    the smaller windows save, see benchmarks/bench_analysis_rate.py), and
+    levels lose the band above analysis_fps / 2, so a threshold cuts
+    differently than at the native rate. Returns the silent intervals and
+    the decoded audio duration in seconds.
+    """
+    tracker = track_silence_in_file(filename, threshold, chunk_size, fps, metric, block_size, analysis_fps)
+    return tracker.silent_intervals, tracker.duration
+
+
+def hysteresis(levels, on, off):
+    """Voiced mask that switches on at levels >= on and off at levels < off.
+
+    ``on`` and ``off`` may be scalars or per-window arrays. Levels in
+    between keep the previous state; the first window starts silent.
+    """
+    above = levels >= on
+    below = levels < off
+    # Index of the last window that decided the state, carried forward
+    decided = np.maximum.accumulate(np.where(above | below, np.arange(len(levels)), -1))
+    return (decided >= 0) & above[np.maximum(decided, 0)]
+
+
+def noise_floor(levels, block, span, percentile=10):
+    """Running noise floor: a low percentile of every block of windows, then
+    the minimum over the ``span`` blocks centred on each block.
+
+    Returns one floor value per window, in linear time.
+    """
+    nblocks = -(-len(levels) // block)
+    padded = np.pad(levels, (0, nblocks * block - len(levels)), mode='edge')
+    per_block = np.percentile(padded.reshape(nblocks, block), percentile, axis=1)
+    history = np.pad(per_block, (span // 2, span - 1 - span // 2), mode='edge')
+    floor = np.lib.stride_tricks.sliding_window_view(history, span).min(axis=1)
+    return np.repeat(floor, block)[:len(levels)]
+
+
+class ThresholdDetector:
+    """Silence is every window whose level is below a single threshold.
+
+    Detectors take an Envelope and return (starts, ends) window indices of
+    its silent runs.
+    """
+
+    def __init__(self, threshold=0.01):
+        self.threshold = threshold
+
+    def detect(self, envelope):
+        return silent_runs(envelope.levels(), self.threshold)
+
+
+class HysteresisDetector:
+    """Voice activity detector with separate on/off thresholds and hangover.
+
+    Speech starts when a window reaches ``on_threshold`` and only ends when
+    one drops below ``off_threshold``. Voiced bursts shorter than
+    ``attack`` seconds are ignored, and every voiced run is held for
+    ``release`` seconds after it ends, so breaths and consonants no longer
+    split a phrase into micro-cuts. With ``adaptive``, both thresholds are
+    raised to at least ``on_ratio`` / ``off_ratio`` times a noise floor
+    taken as the ``floor_percentile`` percentile over ``floor_window``
+    seconds (ratios are applied as dB offsets for the 'db' metric).
+    """
+
+    BLOCK_SECONDS = 0.5  # granularity of the noise floor estimate
+
+    def __init__(self, on_threshold=0.01, off_threshold=None, attack=0.05, release=0.2, adaptive=False,
+                 floor_percentile=10, floor_window=10.0, on_ratio=4.0, off_ratio=2.0):
+        self.on_threshold = on_threshold
+        self.off_threshold = off_threshold
+        self.attack = attack
+        self.release = release
+        self.adaptive = adaptive
+        self.floor_percentile = floor_percentile
+        self.floor_window = floor_window
+        self.on_ratio = on_ratio
+        self.off_ratio = off_ratio
+
+    def thresholds(self, envelope, levels):
+        """Return the (on, off) thresholds, per window when adaptive."""
+        db = envelope.metric == 'db'
+        on = self.on_threshold
+        off = self.off_threshold
+        if off is None:
+            off = on - 6 if db else on / 2
+        if self.adaptive:
+            window_seconds = envelope.chunk_size / envelope.fps
+            block = max(1, round(self.BLOCK_SECONDS / window_seconds))
+            span = max(1, round(self.floor_window / self.BLOCK_SECONDS))
+            floor = noise_floor(levels, block, span, self.floor_percentile)
+            if db:
+                on = np.maximum(on, floor + 20 * np.log10(self.on_ratio))
+                off = np.maximum(off, floor + 20 * np.log10(self.off_ratio))
+            else:
+                on = np.maximum(on, floor * self.on_ratio)
+                off = np.maximum(off, floor * self.off_ratio)
+        return on, off
+
+    def detect(self, envelope):
+        levels = envelope.levels()
+        on, off = self.thresholds(envelope, levels)
+        window_seconds = envelope.chunk_size / envelope.fps
+        voiced = IntervalSet(*mask_runs(hysteresis(levels, on, off)))
+        voiced = voiced.remove_shorter(round(self.attack / window_seconds))
+        voiced = voiced.pad(0, round(self.release / window_seconds), len(levels))
+        silent = voiced.complement(len(levels))
+        return silent.starts, silent.ends
+
+
+DETECTORS = {'threshold': ThresholdDetector, 'hysteresis': HysteresisDetector}
@@ -0,0 +1,104 @@
+import numpy as np
+
+from .audio import DEFAULT_FPS, iter_pcm_blocks
+from .detection import ThresholdDetector, WindowLevels, auto_threshold, window_levels
+from .profiling import NULL_PROFILER
+
+
+class Envelope:
+    """Per-window energy of a whole recording, decoded once and reused.
+
+    ``means`` holds the window means of sample_levels for ``metric``, stored
+    as float32. Windows follow the WindowLevels layout: window k starts at
+    analysis sample k * chunk_size * analysis_fps // fps.
+    """
+
+    def __init__(self, means, chunk_size, fps=DEFAULT_FPS, metric='magnitude', analysis_fps=None,
+                 nsamples=None):
+        self.means = np.asarray(means, dtype=np.float32)
+        self.chunk_size = chunk_size
+        self.fps = fps
+        self.metric = metric
+        self.analysis_fps = analysis_fps or fps
+        if nsamples is None:
+            nsamples = len(self.means) * chunk_size * self.analysis_fps // fps
+        self.nsamples = nsamples
+
+    def __len__(self):
+        return len(self.means)
+
+    @property
+    def duration(self):
+        return self.nsamples / self.analysis_fps
+
+    def window_start(self, index):
+        """First analysis sample of the given window index (or array of indices)."""
+        start = np.asarray(index, dtype=np.int64) * (self.chunk_size * self.analysis_fps) // self.fps
+        return np.minimum(start, self.nsamples)
+
+    def window_time(self, index):
+        return self.window_start(index) / self.analysis_fps
+
+    def levels(self):
+        """Window levels on the threshold's scale (e.g. RMS rather than mean square)."""
+        return window_levels(self.means, self.metric)
+
+    def auto_threshold(self, method='otsu', bins=256):
+        """Threshold separating silence from speech, picked from a histogram of the window levels."""
+        return auto_threshold(self.levels(), method, self.metric, bins)
+
+    def rebin(self, chunk_size):
+        """Envelope for a coarser window that is a whole multiple of this one.
+
+        Each new window is the sample-weighted mean of the windows it covers,
+        which is exactly what decoding again with the larger window would give.
+        """
+        if chunk_size == self.chunk_size:
+            return self
+        factor, remainder = divmod(chunk_size, self.chunk_size)
+        if remainder or not factor:
+            raise ValueError(f"chunk_size {chunk_size} is not a multiple of {self.chunk_size}.")
+        sizes = np.diff(self.window_start(np.arange(len(self.means) + 1))).astype(np.float64)
+        groups = np.arange(0, len(self.means), factor)
+        means = np.add.reduceat(self.means * sizes, groups) / np.add.reduceat(sizes, groups)
+        return Envelope(means, chunk_size, self.fps, self.metric, self.analysis_fps, self.nsamples)
+
+    def detect(self, detector):
+        """Run a detector (see detection.DETECTORS) and return its silent runs as analysis sample positions."""
+        starts, ends = detector.detect(self)
+        return self.window_start(starts), self.window_start(ends)
+
+    def silent_sample_runs(self, threshold):
+        """Return (starts, ends) as analysis sample positions of the runs of windows below threshold."""
+        return self.detect(ThresholdDetector(threshold))
+
+    def silent_runs(self, threshold):
+        """Return (starts, ends) in seconds of the runs of windows below threshold."""
+        starts, ends = self.silent_sample_runs(threshold)
+        return starts / self.analysis_fps, ends / self.analysis_fps
+
+
+def compute_envelope(filename, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude', analysis_fps=None,
+                     block_size=1 << 16, stream=None, profiler=None, pcm=None):
+    """Decode the audio of a media file (its N-th audio stream with ``stream``) once and return its Envelope.
+
+    With a PcmStore as ``pcm`` its samples are read instead, at its rate.
+    """
+    profiler = profiler or NULL_PROFILER
+    if pcm is not None:
+        windows = WindowLevels(chunk_size, fps, metric, pcm.rate)
+        blocks = pcm.iter_blocks(block_size)
+    else:
+        windows = WindowLevels(chunk_size, fps, metric, analysis_fps)
+        blocks = iter_pcm_blocks(filename, fps=windows.analysis_fps, block_size=block_size, stream=stream)
+    means = []
+    for block in profiler.timed('decode', blocks):
+        with profiler.stage('windows'):
+            means.append(windows.feed(block).astype(np.float32))
+    means.append(windows.finish().astype(np.float32))
+    if not windows.samples_seen:
+        raise ValueError("The video has no audio track.")
+    profiler.count('samples_decoded', windows.samples_seen)
+    profiler.count('windows_evaluated', windows.windows_seen)
+    return Envelope(np.concatenate(means), chunk_size, fps, metric, windows.analysis_fps,
+                    windows.samples_seen)
@@ -0,0 +1,200 @@
+"""Exporters that write a CutList for one editor or tool each.
+
+EXPORTERS maps a format name to a function (cut_list, path); new formats
+are added by registering another function there. export_cut_list picks the
+format from the file extension unless one is given.
+"""
+import math
+import os
+import pathlib
+from xml.sax.saxutils import quoteattr
+
+# Frame size of the MLT profile families, for formats that need one when the source's is unknown
+PROFILE_SIZES = {'hdv_720': (1280, 720), 'atsc_1080p': (1920, 1080)}
+# Record side of an EDL starts at 01:00:00:00 by convention
+EDL_RECORD_START_HOURS = 1
+
+
+def profile_size(profile):
+    for prefix, size in PROFILE_SIZES.items():
+        if profile.startswith(prefix):
+            return size
+    raise ValueError(f"Unknown frame size for MLT profile: {profile!r}")
+
+
+def smpte_timecode(frame, frame_rate):
+    """SMPTE 'HH:MM:SS:FF' of a frame number; 29.97/59.94 use drop-frame 'HH:MM:SS;FF'."""
+    num, den = frame_rate
+    fps = round(num / den)
+    drop = den == 1001 and fps in (30, 60)
+    if drop:
+        # Frame numbers 0 and 1 (0-3 at 59.94) are skipped every minute except every tenth
+        dropped = fps // 15
+        per_ten_minutes = fps * 600 - 9 * dropped
+        per_minute = fps * 60 - dropped
+        tens, rest = divmod(frame, per_ten_minutes)
+        frame += 9 * dropped * tens + (dropped * ((rest - dropped) // per_minute) if rest > dropped else 0)
+    frames = frame % fps
+    seconds = frame // fps
+    separator = ';' if drop else ':'
+    return f"{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}{separator}{frames:02d}"
+
+
+def _hour_frames(frame_rate):
+    """Frames in one hour of timecode (fewer than fps * 3600 with drop-frame)."""
+    num, den = frame_rate
+    fps = round(num / den)
+    if den == 1001 and fps in (30, 60):
+        return fps * 3600 - 54 * (fps // 15)
+    return fps * 3600
+
+
+def _title(cut_list):
+    return os.path.splitext(os.path.basename(cut_list.source))[0]
+
+
+def export_mlt(cut_list, path):
+    from .mlt import write_mlt
+
+    write_mlt(path, cut_list.source, list(cut_list.keep), cut_list.length, cut_list.profile, cut_list.properties)
+
+
+def export_edl(cut_list, path):
+    """CMX3600 EDL: one audio+video event per kept section, laid back to back from 01:00:00:00.
+
+    Timecodes count the source's own frames. Event numbers keep counting
+    past 999, which most editors accept.
+    """
+    keep, _, frame_rate = cut_list.source_frames()
+    drop = frame_rate[1] == 1001 and round(frame_rate[0] / frame_rate[1]) in (30, 60)
+    name = os.path.basename(cut_list.source)
+    lines = [f"TITLE: {_title(cut_list)}", f"FCM: {'DROP FRAME' if drop else 'NON-DROP FRAME'}", ""]
+    record = EDL_RECORD_START_HOURS * _hour_frames(frame_rate)
+    for event, (start, end) in enumerate(keep, 1):
+        # EDL out points are exclusive
+        source_in, source_out = smpte_timecode(start, frame_rate), smpte_timecode(end, frame_rate)
+        record_in, record_out = smpte_timecode(record, frame_rate), smpte_timecode(record + end - start, frame_rate)
+        lines.append(f"{event:03d}  AX       AA/V  C        {source_in} {source_out} {record_in} {record_out}")
+        lines.append(f"* FROM CLIP NAME: {name}")
+        record += end - start
+    with open(path, 'w', encoding='utf-8', newline='\r\n') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def _rational(frames, frame_rate):
+    """FCPXML time of a frame count: a reduced fraction of seconds such as '1001/30000s'."""
+    num, den = frame_rate
+    numerator, denominator = frames * den, num
+    divisor = math.gcd(numerator, denominator) or 1
+    numerator, denominator = numerator // divisor, denominator // divisor
+    return f"{numerator}s" if denominator == 1 else f"{numerator}/{denominator}s"
+
+
+FCPXML_AUDIO_RATES = {32000: '32k', 44100: '44.1k', 48000: '48k', 88200: '88.2k', 96000: '96k', 176400: '176.4k',
+                      192000: '192k'}
+
+
+def export_fcpxml(cut_list, path):
+    """FCPXML 1.9: one asset for the source and an asset-clip per kept section on the spine.
+
+    Times count the source's own frames and the format has its size. The
+    asset's audio is described from the source; when it cannot be read any
+    more, 48 kHz stereo is assumed.
+    """
+    from .audio import probe_audio_format
+
+    keep, length, frame_rate = cut_list.source_frames()
+    num, den = frame_rate
+    width, height = cut_list.source_size or profile_size(cut_list.profile)
+    rate_label = {(24000, 1001): '2398', (30000, 1001): '2997', (60000, 1001): '5994'}.get(frame_rate, str(num))
+    drop = den == 1001 and round(num / den) in (30, 60)
+    tc_format = 'DF' if drop else 'NDF'
+    if length is None:
+        length = int(keep.ends[-1]) if len(keep) else 0
+    title = _title(cut_list)
+    source_url = pathlib.Path(os.path.abspath(cut_list.source)).as_uri()
+    try:
+        audio = probe_audio_format(cut_list.source)
+    except OSError:
+        audio = (48000, 2)
+    if audio:
+        sample_rate, channels = audio
+        audio_attributes = f'hasAudio="1" audioSources="1" audioChannels="{channels}" audioRate="{sample_rate}"'
+        layout = {1: 'mono', 2: 'stereo'}.get(channels, 'surround')
+        # Sequences only take the standard rates; others are resampled to 48k
+        sequence_audio = f'audioLayout="{layout}" audioRate="{FCPXML_AUDIO_RATES.get(sample_rate, "48k")}"'
+    else:
+        audio_attributes = 'hasAudio="0"'
+        sequence_audio = 'audioLayout="stereo" audioRate="48k"'
+
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<!DOCTYPE fcpxml>', '<fcpxml version="1.9">',
+             '  <resources>',
+             f'    <format id="r1" name="FFVideoFormat{height}p{rate_label}" '
+             f'frameDuration="{_rational(1, frame_rate)}" width="{width}" height="{height}"/>',
+             f'    <asset id="r2" name={quoteattr(title)} start="0s" duration="{_rational(length, frame_rate)}" '
+             f'hasVideo="1" format="r1" {audio_attributes}>',
+             f'      <media-rep kind="original-media" src={quoteattr(source_url)}/>',
+             '    </asset>',
+             '  </resources>',
+             '  <library>',
+             '    <event name="video_editor">',
+             f'      <project name={quoteattr(title)}>',
+             f'        <sequence format="r1" duration="{_rational(keep.total(), frame_rate)}" '
+             f'tcStart="0s" tcFormat="{tc_format}" {sequence_audio}>',
+             '          <spine>']
+    offset = 0
+    for start, end in keep:
+        lines.append(f'            <asset-clip ref="r2" name={quoteattr(title)} '
+                     f'offset="{_rational(offset, frame_rate)}" start="{_rational(start, frame_rate)}" '
+                     f'duration="{_rational(end - start, frame_rate)}" tcFormat="{tc_format}"/>')
+        offset += end - start
+    lines += ['          </spine>', '        </sequence>', '      </project>', '    </event>', '  </library>',
+              '</fcpxml>']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def export_concat(cut_list, path):
+    """ffmpeg concat demuxer list with inpoint/outpoint per section (ffmpeg -f concat -safe 0 -i PATH)."""
+    from .stream_copy import write_concat_list
+
+    keep, _, frame_rate = cut_list.source_frames()
+    write_concat_list(path, [(cut_list.source, start, end) for start, end in keep.to_seconds(frame_rate)])
+
+
+def export_filter(cut_list, path):
+    """ffmpeg filter graph keeping the sections, for -filter_complex_script PATH -map [v] -map [a]."""
+    from .parallel import select_expression
+
+    keep = select_expression(cut_list.sections(), 0.0)
+    with open(path, 'w') as f:
+        f.write(f"[0:v]select='{keep}',setpts=N/FRAME_RATE/TB[v];"
+                f"[0:a]aselect='{keep}',asetpts=N/SR/TB[a]\n")
+
+
+def export_json(cut_list, path):
+    cut_list.save(path)
+
+
+EXPORTERS = {
+    'mlt': export_mlt,
+    'edl': export_edl,
+    'fcpxml': export_fcpxml,
+    'concat': export_concat,
+    'filter': export_filter,
+    'json': export_json,
+}
+EXTENSIONS = {'.mlt': 'mlt', '.edl': 'edl', '.fcpxml': 'fcpxml', '.ffconcat': 'concat', '.txt': 'concat',
+              '.filter': 'filter', '.json': 'json'}
+
+
+def export_cut_list(cut_list, path, fmt=None):
+    """Write cut_list to path in format ``fmt`` (one of EXPORTERS), by default chosen from the extension."""
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+        if fmt is None:
+            raise ValueError(f"Cannot tell the export format of {path}; pass one of {', '.join(EXPORTERS)}.")
+    if fmt not in EXPORTERS:
+        raise ValueError(f"Unknown export format: {fmt!r}")
+    EXPORTERS[fmt](cut_list, path)
+    return fmt
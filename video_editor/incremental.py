@@ -0,0 +1,111 @@
+"""Re-analyze a growing recording by decoding only the audio appended since the last run.
+
+The SilenceTracker is saved unfinished next to the project (open silent run
+and partial window included), so the next run seeks ffmpeg to the first
+unanalyzed sample and carries on. The voiced sections are rebuilt from the
+stored silent runs, and only the playlist entries that changed are
+rewritten in the MLT project.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .audio import DEFAULT_FPS, iter_pcm_blocks
+from .cache import HASH_BLOCK, _write_atomic
+from .detection import SilenceTracker
+from .intervals import voiced_frames
+from .mlt import patch_mlt, unchanged_entries, write_mlt
+from .timecode import DEFAULT_PROFILE, profile_frame_rate, samples_to_frames
+
+STATE_SUFFIX = '.state.json'
+
+
+def head_hash(filename, nbytes=HASH_BLOCK):
+    """MD5 of the start of a file, which appending to it leaves unchanged.
+
+    Only as many bytes as the file had go into the hash, so a short file
+    must be compared on the same number of bytes after it has grown.
+    """
+    with open(filename, 'rb') as f:
+        return hashlib.md5(f.read(nbytes)).hexdigest()
+
+
+def state_path(output_file):
+    return output_file + STATE_SUFFIX
+
+
+def load_state(output_file, input_video, options):
+    """Return the saved state if it can be resumed for this input and these options."""
+    path = state_path(output_file)
+    if not os.path.exists(path) or not os.path.exists(output_file):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    size = os.path.getsize(input_video)
+    if (state.get('input') != os.path.abspath(input_video) or state.get('options') != options
+            or size < state['size']
+            or head_hash(input_video, state.get('head_bytes', HASH_BLOCK)) != state['head_hash']):
+        return None
+    return state
+
+
+def update_project(input_video, output_file, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                   metric='magnitude', fps=DEFAULT_FPS, analysis_fps=None, profile=DEFAULT_PROFILE,
+                   pre_roll=0.0, post_roll=0.0, min_keep=0.0, min_cut=0.0, block_size=1 << 16):
+    """Bring an MLT project up to date with a recording that may have grown since the last run.
+
+    The first run analyzes the whole file; later runs with the same options
+    decode only from the last analyzed sample onwards. The state is
+    discarded (and everything analyzed again) when the input was replaced
+    rather than appended to. Returns the voiced IntervalSet in frames and
+    the number of seconds decoded by this run.
+    """
+    if isinstance(threshold, str):
+        raise ValueError("Incremental analysis needs a fixed threshold.")
+    options = {'threshold': threshold, 'chunk_size': chunk_size, 'merge_threshold': merge_threshold,
+               'metric': metric, 'fps': fps, 'analysis_fps': analysis_fps, 'profile': profile,
+               'pre_roll': pre_roll, 'post_roll': post_roll, 'min_keep': min_keep, 'min_cut': min_cut}
+    state = load_state(output_file, input_video, options)
+    if state:
+        tracker = SilenceTracker.from_state(state['tracker'])
+    else:
+        tracker = SilenceTracker(threshold, chunk_size, fps, metric, analysis_fps)
+    # Sizes are taken before decoding so audio appended meanwhile is picked up next time
+    size = os.path.getsize(input_video)
+    head_bytes = min(size, HASH_BLOCK)
+    digest = head_hash(input_video, head_bytes)
+
+    resumed_at = tracker.samples_seen
+    # Nothing to decode when the file has not grown
+    if not state or size > state['size']:
+        for block in iter_pcm_blocks(input_video, fps=tracker.analysis_fps, block_size=block_size,
+                                     start_sample=resumed_at):
+            tracker.feed(block)
+    if not tracker.samples_seen:
+        raise ValueError("The video has no audio track.")
+
+    # Save the tracker before closing the open run and the partial window
+    tracker_state = tracker.state()
+    tracker.finish()
+    silent_starts, silent_ends = zip(*tracker.silent_samples) if tracker.silent_samples else ((), ())
+    frame_rate = profile_frame_rate(profile)
+    voiced = voiced_frames(silent_starts, silent_ends, tracker.samples_seen, tracker.analysis_fps, frame_rate,
+                           merge_threshold, pre_roll, post_roll, min_keep, min_cut)
+    length = int(samples_to_frames(tracker.samples_seen, tracker.analysis_fps, frame_rate))
+    frames = np.column_stack((voiced.starts, voiced.ends))
+    properties = {'video_editor:threshold': f'{threshold:.6g}'}
+
+    if state:
+        # Entries before the first one that differs are already in the file
+        unchanged = unchanged_entries(state['frames'], frames)
+        patch_mlt(output_file, input_video, frames, unchanged, length, profile, properties)
+    else:
+        write_mlt(output_file, input_video, frames, length, profile, properties)
+
+    state = {'input': os.path.abspath(input_video), 'options': options, 'size': size, 'head_hash': digest,
+             'head_bytes': head_bytes, 'tracker': tracker_state, 'frames': frames.tolist()}
+    _write_atomic(state_path(output_file), lambda f: f.write(json.dumps(state).encode()))
+    return voiced, (tracker.samples_seen - resumed_at) / tracker.analysis_fps
+
@@ -0,0 +1,183 @@
+import numpy as np
+
+from .timecode import frames_to_seconds, samples_to_frames
+
+# Voiced sections shorter than this many frames are dropped after snapping
+MIN_FRAMES = 2
+
+
+def merge_runs(starts, ends, merge_threshold):
+    """Merge sorted runs (as start/end arrays) separated by gaps of at most merge_threshold."""
+    if not len(starts):
+        return starts, ends
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] > merge_threshold)
+    return starts[np.append(0, breaks + 1)], ends[np.append(breaks, len(ends) - 1)]
+
+
+def complement_runs(starts, ends, duration):
+    """Gaps between sorted runs within [0, duration], dropping empty ones.
+
+    Works on seconds or on integer sample/frame positions alike.
+    """
+    gap_starts = np.concatenate((np.zeros(1, dtype=ends.dtype), ends))
+    gap_ends = np.concatenate((starts, np.array([duration], dtype=starts.dtype)))
+    keep = gap_starts < gap_ends
+    return gap_starts[keep], gap_ends[keep]
+
+
+class IntervalSet:
+    """Sorted, disjoint half-open intervals [start, end) on an integer timeline.
+
+    Positions are sample or frame numbers held in two int64 arrays, and
+    every operation works on the whole arrays at once: complement, gap
+    merging, padding and length filters are linear, union and intersection
+    are a stable sort of already sorted runs.
+    """
+
+    def __init__(self, starts=(), ends=()):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        if self.starts.shape != self.ends.shape:
+            raise ValueError("starts and ends must have the same length.")
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Build a set from (start, end) pairs, sorting and joining overlaps."""
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+        starts, ends = pairs[:, 0], pairs[:, 1]
+        keep = ends > starts
+        # Running maximum of the ends lets nested intervals merge into their parent
+        return cls(starts[keep], np.maximum.accumulate(ends[keep])).merge_gaps(0)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts.tolist(), self.ends.tolist())
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends)
+
+    def __repr__(self):
+        return f"IntervalSet({list(self)!r})"
+
+    @property
+    def lengths(self):
+        return self.ends - self.starts
+
+    def total(self):
+        """Summed length of all intervals."""
+        return int(self.lengths.sum())
+
+    def complement(self, length):
+        """Gaps between the intervals within [0, length)."""
+        return IntervalSet(*complement_runs(self.starts, self.ends, length))
+
+    def merge_gaps(self, max_gap):
+        """Join intervals separated by gaps of at most max_gap."""
+        return IntervalSet(*merge_runs(self.starts, self.ends, max_gap))
+
+    def pad(self, pre_roll=0, post_roll=0, length=None):
+        """Extend every interval by pre_roll before and post_roll after, clipped to [0, length)."""
+        starts = np.maximum(self.starts - pre_roll, 0)
+        ends = self.ends + post_roll
+        if length is not None:
+            ends = np.minimum(ends, length)
+        # Intervals starting at or past the length are empty after clipping
+        keep = ends > starts
+        # Uniform padding keeps both arrays sorted, so overlaps are negative gaps
+        return IntervalSet(starts[keep], ends[keep]).merge_gaps(0)
+
+    def remove_shorter(self, min_length):
+        """Drop intervals shorter than min_length (minimum keep)."""
+        keep = self.lengths >= min_length
+        return IntervalSet(self.starts[keep], self.ends[keep])
+
+    def fill_gaps_shorter(self, min_gap, length=None):
+        """Close gaps shorter than min_gap (minimum cut).
+
+        With a length, the gaps before the first and after the last interval
+        count as well.
+        """
+        result = self.merge_gaps(min_gap - 1)
+        if length is None or not len(result):
+            return result
+        starts, ends = result.starts.copy(), result.ends.copy()
+        if starts[0] < min_gap:
+            starts[0] = 0
+        if 0 < length - ends[-1] < min_gap:
+            ends[-1] = length
+        return IntervalSet(starts, ends)
+
+    def to_frames(self, sample_rate, frame_rate, min_frames=MIN_FRAMES):
+        """Snap an interval set in samples to frame boundaries.
+
+        Intervals that touch after rounding are joined, and those shorter
+        than min_frames (the zero- and one-frame fragments rounding leaves)
+        dropped.
+        """
+        frames = IntervalSet(samples_to_frames(self.starts, sample_rate, frame_rate),
+                             samples_to_frames(self.ends, sample_rate, frame_rate))
+        return frames.merge_gaps(0).remove_shorter(min_frames)
+
+    def to_seconds(self, rate):
+        """(start, end) pairs in seconds for a timeline counting rate = (num, den) units per second."""
+        return list(zip(frames_to_seconds(self.starts, rate).tolist(), frames_to_seconds(self.ends, rate).tolist()))
+
+    def union(self, *others):
+        return coverage((self,) + others, 1)
+
+    def intersection(self, *others):
+        return coverage((self,) + others, len(others) + 1)
+
+
+def coverage(sets, minimum):
+    """Intervals covered by at least ``minimum`` of the given interval sets.
+
+    minimum=1 gives the union and minimum=len(sets) the intersection.
+    """
+    sets = list(sets)
+    if not sets:
+        return IntervalSet()
+    positions = np.concatenate([s.starts for s in sets] + [s.ends for s in sets])
+    deltas = np.concatenate([np.ones(len(s), dtype=np.int64) for s in sets]
+                            + [np.full(len(s), -1, dtype=np.int64) for s in sets])
+    # At equal positions ends sort before starts, so touching intervals never overlap
+    order = np.argsort(2 * positions + (deltas > 0), kind='stable')
+    positions = positions[order]
+    inside = np.cumsum(deltas[order]) >= minimum
+    edges = np.diff(np.concatenate(([False], inside, [False])).astype(np.int8))
+    starts = positions[np.flatnonzero(edges[:-1] == 1)]
+    ends = positions[np.flatnonzero(edges == -1)]
+    keep = ends > starts
+    return IntervalSet(starts[keep], ends[keep]).merge_gaps(0)
+
+
+def voiced_frames(silent_starts, silent_ends, nsamples, sample_rate, frame_rate, merge_threshold=0.0,
+                  pre_roll=0.0, post_roll=0.0, min_keep=0.0, min_cut=0.0, min_frames=MIN_FRAMES):
+    """Voiced sections as an IntervalSet of frames, from silent runs given in samples.
+
+    Silent runs separated by at most merge_threshold seconds are merged,
+    the voiced complement is padded by pre_roll/post_roll seconds, cuts
+    shorter than min_cut and sections shorter than min_keep are removed,
+    and only then is the result snapped to frames; everything before the
+    snap is exact integer arithmetic.
+    """
+    silent = IntervalSet(silent_starts, silent_ends).merge_gaps(round(merge_threshold * sample_rate))
+    return refine_voiced(silent.complement(nsamples), nsamples, sample_rate, frame_rate, pre_roll, post_roll,
+                         min_keep, min_cut, min_frames)
+
+
+def refine_voiced(voiced, nsamples, sample_rate, frame_rate, pre_roll=0.0, post_roll=0.0, min_keep=0.0,
+                  min_cut=0.0, min_frames=MIN_FRAMES):
+    """Pad and filter voiced sections given in samples (as voiced_frames does), then snap them to frames."""
+    if pre_roll or post_roll:
+        voiced = voiced.pad(round(pre_roll * sample_rate), round(post_roll * sample_rate), nsamples)
+    if min_cut:
+        voiced = voiced.fill_gaps_shorter(round(min_cut * sample_rate), nsamples)
+    if min_keep:
+        voiced = voiced.remove_shorter(round(min_keep * sample_rate))
+    return voiced.to_frames(sample_rate, frame_rate, min_frames)
@@ -0,0 +1,238 @@
+"""Live silence detection on a PCM stream: a pipe, stdin or a named FIFO.
+
+Audio is read in small frames and analyzed as it arrives. Keep/cut
+decisions are held back by a fixed lookahead, which is also the longest a
+silence may last and still be kept, and are emitted as JSONL events with the
+measured time between the audio at the boundary arriving and the decision.
+"""
+import collections
+import json
+import math
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+from .audio import DEFAULT_FPS
+from .detection import WindowLevels, mask_runs, window_levels
+from .intervals import MIN_FRAMES
+from .mlt import patch_mlt, write_mlt
+from .timecode import DEFAULT_PROFILE, profile_frame_rate, samples_to_frames
+
+
+def open_pcm_stream(stream, rate=16000, channels=1):
+    """Return (reader, rate, channels) for a buffered binary stream.
+
+    WAV input is recognized by its RIFF header, which supplies the rate and
+    channel count; anything else is taken as raw s16le at the given ones.
+    """
+    if stream.peek(4)[:4] == b'RIFF':
+        reader = wave.open(stream, 'rb')
+        if reader.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV input is supported.")
+        return reader, reader.getframerate(), reader.getnchannels()
+    return stream, rate, channels
+
+
+def iter_pcm_frames(reader, frame_samples, channels, rate, realtime=False):
+    """Yield (samples, arrival_time) for consecutive frames of s16 PCM, mixed down to mono.
+
+    With realtime, each frame is released no earlier than it would have
+    been captured, which paces a file as if it were a live source.
+    """
+    if hasattr(reader, 'readframes'):
+        read = reader.readframes
+    else:
+        read = lambda count: reader.read(count * 2 * channels)
+    started = time.monotonic()
+    total = 0
+    leftover = b''
+    while True:
+        data = read(frame_samples)
+        if not data:
+            break
+        data = leftover + data
+        usable = len(data) - len(data) % (2 * channels)
+        data, leftover = data[:usable], data[usable:]
+        samples = np.frombuffer(data, dtype='<i2')
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1) * (1.0 / 32768)
+        total += len(samples)
+        if realtime:
+            delay = started + total / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield samples, time.monotonic()
+
+
+class LiveDetector:
+    """Streaming keep/cut segmentation with a fixed lookahead.
+
+    Windows below ``threshold`` are silent. A silent run is cut once it
+    lasts ``min_cut`` seconds, and every window is decided ``lookahead``
+    seconds after it is received. Because min_cut may not exceed the
+    lookahead, decisions are final when they are made.
+    """
+
+    def __init__(self, threshold=0.01, chunk_size=100, fps=DEFAULT_FPS, metric='magnitude', rate=16000,
+                 lookahead=0.5, min_cut=None):
+        if min_cut is None:
+            min_cut = lookahead
+        if min_cut > lookahead:
+            raise ValueError("min_cut cannot be longer than the lookahead.")
+        self.threshold = threshold
+        self.windows = WindowLevels(chunk_size, fps, metric, analysis_fps=rate)
+        self.lookahead_windows = math.ceil(lookahead * fps / chunk_size)
+        self.min_cut_windows = max(1, math.ceil(min_cut * fps / chunk_size))
+        self.pending = np.zeros(0, dtype=bool)  # silence of the windows not decided yet
+        self.decided = 0  # index of the first undecided window
+        self.kind = None  # 'keep' or 'cut' of the open segment
+        self.segment_start = 0
+
+    @property
+    def rate(self):
+        return self.windows.analysis_fps
+
+    @property
+    def samples_seen(self):
+        return self.windows.samples_seen
+
+    def feed(self, samples):
+        """Analyze the next frame; returns the (kind, start, end) segments closed by it, in samples."""
+        self._append(self.windows.feed(samples))
+        return self._decide(len(self.pending) - self.lookahead_windows)
+
+    def finish(self):
+        """Decide the remaining windows and close the open segment."""
+        self._append(self.windows.finish())
+        segments = self._decide(len(self.pending))
+        if self.kind is not None:
+            segments.append(self._close(self.decided))
+            self.kind = None
+        return segments
+
+    def _append(self, means):
+        if len(means):
+            silent = window_levels(means, self.windows.metric) < self.threshold
+            self.pending = np.concatenate((self.pending, silent))
+
+    def _decide(self, count):
+        if count <= 0:
+            return []
+        starts, ends = mask_runs(self.pending)
+        long_runs = ends - starts >= self.min_cut_windows
+        # A silent run that is already being cut keeps being cut however short its remainder is
+        if self.kind == 'cut' and len(starts) and starts[0] == 0:
+            long_runs[0] = True
+        edges = np.zeros(len(self.pending) + 1, dtype=np.int64)
+        np.add.at(edges, starts[long_runs], 1)
+        np.add.at(edges, ends[long_runs], -1)
+        cut = np.cumsum(edges[:count]) > 0
+
+        segments = []
+        if self.kind is None:
+            self.kind = 'cut' if cut[0] else 'keep'
+            self.segment_start = self.decided
+        if (self.kind == 'cut') != cut[0]:
+            segments.append(self._close(self.decided))
+        for change in (np.flatnonzero(cut[1:] != cut[:-1]) + 1).tolist():
+            segments.append(self._close(self.decided + change))
+        self.kind = 'cut' if cut[-1] else 'keep'
+
+        self.pending = self.pending[count:]
+        self.decided += count
+        return segments
+
+    def _close(self, window):
+        start, end = np.minimum(self.windows.window_start([self.segment_start, window]), self.samples_seen).tolist()
+        segment = (self.kind, start, end)
+        self.kind = 'keep' if self.kind == 'cut' else 'cut'
+        self.segment_start = window
+        return segment
+
+
+class KeptFrames:
+    """Kept segments snapped to frames as they are decided, like IntervalSet.to_frames on all of them.
+
+    Segments arrive in order, so only the last entry can still change: it
+    grows while the next segment touches it after rounding, and is listed
+    once it is at least min_frames long.
+    """
+
+    def __init__(self, rate, frame_rate, min_frames=MIN_FRAMES):
+        self.rate = rate
+        self.frame_rate = frame_rate
+        self.min_frames = min_frames
+        self._frames = np.empty((64, 2), dtype=np.int64)
+        self._count = 0
+        self._last = None  # merged frame range of the latest segments, however short
+
+    def add(self, start, end):
+        """Add the next kept segment in samples and return how many leading entries did not change."""
+        first, last = samples_to_frames(np.array([start, end]), self.rate, self.frame_rate).tolist()
+        if self._last and first <= self._last[1]:
+            if self._count and self._frames[self._count - 1, 0] == self._last[0]:
+                self._count -= 1
+            self._last = (self._last[0], max(self._last[1], last))
+        else:
+            self._last = (first, last)
+        unchanged = self._count
+        if self._last[1] - self._last[0] >= self.min_frames:
+            if self._count == len(self._frames):
+                self._frames = np.concatenate((self._frames, np.empty_like(self._frames)))
+            self._frames[self._count] = self._last
+            self._count += 1
+        return unchanged
+
+    @property
+    def frames(self):
+        return self._frames[:self._count]
+
+
+def run_live(reader, rate, channels, detector, frame_samples, realtime=False, out=None, mlt_path=None,
+             resource=None, profile=DEFAULT_PROFILE):
+    """Feed a PCM stream through a LiveDetector and emit one JSON line per decided segment.
+
+    Every event carries its latency: the time from the arrival of the audio
+    at the segment's end to the decision. With mlt_path, an MLT project of
+    the kept segments is updated after every decision. Returns the summary
+    that is also written as the last line.
+    """
+    out = out or sys.stdout
+    frame_rate = profile_frame_rate(profile)
+    arrivals = collections.deque()  # (samples received so far, arrival time) per frame
+    latencies = []
+    kept = KeptFrames(rate, frame_rate)
+
+    def emit(segments):
+        for kind, start, end in segments:
+            while len(arrivals) > 1 and arrivals[0][0] < end:
+                arrivals.popleft()
+            latency = time.monotonic() - arrivals[0][1]
+            latencies.append(latency)
+            out.write(json.dumps({'type': kind, 'start': start / rate, 'end': end / rate,
+                                  'latency_ms': round(latency * 1000, 3)}) + '\n')
+            out.flush()
+            if kind == 'keep' and mlt_path:
+                unchanged = kept.add(start, end)
+                length = int(samples_to_frames(detector.samples_seen, rate, frame_rate))
+                if unchanged and os.path.exists(mlt_path):
+                    patch_mlt(mlt_path, resource, kept.frames, unchanged, length, profile)
+                else:
+                    write_mlt(mlt_path, resource, kept.frames, length, profile)
+
+    for samples, arrived in iter_pcm_frames(reader, frame_samples, channels, rate, realtime):
+        arrivals.append((detector.samples_seen + len(samples), arrived))
+        emit(detector.feed(samples))
+    emit(detector.finish())
+
+    summary = {'type': 'summary', 'audio_seconds': detector.samples_seen / rate, 'segments': len(latencies)}
+    if latencies:
+        summary['latency_ms'] = {'mean': round(float(np.mean(latencies)) * 1000, 3),
+                                 'p95': round(float(np.percentile(latencies, 95)) * 1000, 3),
+                                 'max': round(max(latencies) * 1000, 3)}
+    out.write(json.dumps(summary) + '\n')
+    out.flush()
+    return summary
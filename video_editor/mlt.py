@@ -0,0 +1,169 @@
+from itertools import chain
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+from .timecode import DEFAULT_PROFILE, frames_to_timecodes, profile_frame_rate
+
+MLT_VERSION = '7.4.0'
+
+
+def _iter_chain(chain_id, resource, length, frame_rate, properties=None):
+    if length is not None:
+        length_tc, out_tc = frames_to_timecodes([length, length - 1], frame_rate)
+        yield f'  <chain id="{chain_id}" out="{out_tc}">\n'
+        yield f'    <property name="length">{length_tc}</property>\n'
+    else:
+        yield f'  <chain id="{chain_id}">\n'
+    yield f'    <property name="resource">{escape(resource)}</property>\n'
+    yield '    <property name="mlt_service">avformat-novalidate</property>\n'
+    yield '    <property name="seekable">1</property>\n'
+    for name, value in (properties or {}).items():
+        yield f'    <property name={quoteattr(name)}>{escape(str(value))}</property>\n'
+    yield '  </chain>\n'
+
+
+def _iter_playlist_head(playlist_id, kind, name):
+    yield f'  <playlist id="{playlist_id}">\n'
+    yield f'    <property name="shotcut:{kind}">1</property>\n'
+    yield f'    <property name="shotcut:name">{escape(name)}</property>\n'
+
+
+def _iter_head(resource, length, frame_rate, profile):
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield f'<mlt LC_NUMERIC="C" version="{MLT_VERSION}" profile={quoteattr(profile)}>\n'
+    # One chain for the source file; entries cut it with in/out
+    yield from _iter_chain('chain0', resource, length, frame_rate)
+    yield from _iter_playlist_head('playlist0', 'video', 'V1')
+
+
+def _iter_entries(frames, frame_rate, producer='chain0'):
+    starts, ends = np.asarray(frames, dtype=np.int64).reshape(-1, 2).T
+    # MLT out points are inclusive
+    for in_tc, out_tc in zip(frames_to_timecodes(starts, frame_rate), frames_to_timecodes(ends - 1, frame_rate)):
+        yield f'    <entry producer="{producer}" in="{in_tc}" out="{out_tc}"/>\n'
+
+
+def _iter_tail(properties):
+    yield '  </playlist>\n'
+    yield '  <tractor id="tractor0">\n'
+    yield '    <property name="shotcut">1</property>\n'
+    for name, value in (properties or {}).items():
+        yield f'    <property name={quoteattr(name)}>{escape(str(value))}</property>\n'
+    yield '    <track producer="playlist0"/>\n'
+    yield '  </tractor>\n'
+    yield '</mlt>\n'
+
+
+# Every entry line has the same length while timecodes stay below 100 hours
+ENTRY_BYTES = len(next(_iter_entries([(0, 1)], (25, 1))).encode())
+
+
+def iter_mlt(resource, frames, length=None, profile=DEFAULT_PROFILE, properties=None):
+    """Yield the text of an MLT project that plays ``frames`` of ``resource`` in order.
+
+    ``frames`` are (start, end) frame numbers at the profile's frame rate,
+    end exclusive; ``length`` is the source length in frames. Every section
+    becomes one playlist entry with in/out attributes on a single shared
+    chain, so the project grows by one short line per cut. ``properties``
+    are extra name/value pairs stored on the tractor.
+    """
+    frame_rate = profile_frame_rate(profile)
+    yield from _iter_head(resource, length, frame_rate, profile)
+    yield from _iter_entries(frames, frame_rate)
+    yield from _iter_tail(properties)
+
+
+def write_mlt(output_file, resource, frames, length=None, profile=DEFAULT_PROFILE, properties=None):
+    """Write an MLT project for the given frame ranges with a single buffered write."""
+    text = ''.join(iter_mlt(resource, frames, length, profile, properties))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def iter_multitrack_mlt(tracks, frames, profile=DEFAULT_PROFILE, properties=None):
+    """Yield the text of an MLT project that cuts several tracks with the same ``frames``.
+
+    ``tracks`` are dicts with the 'resource', 'length' (in frames),
+    'audio_index' and 'video_index' (absolute stream indices, -1 for none)
+    of each track. Every track gets its own chain and a playlist with
+    identical entries, so the tracks stay in sync; the audio of all tracks
+    is mixed together by 'mix' transitions onto the first one.
+    """
+    frame_rate = profile_frame_rate(profile)
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield f'<mlt LC_NUMERIC="C" version="{MLT_VERSION}" profile={quoteattr(profile)}>\n'
+    videos = audios = 0
+    for i, track in enumerate(tracks):
+        yield from _iter_chain(f'chain{i}', track['resource'], track['length'], frame_rate,
+                               {'audio_index': track['audio_index'], 'video_index': track['video_index']})
+        if track['video_index'] >= 0:
+            videos += 1
+            yield from _iter_playlist_head(f'playlist{i}', 'video', f'V{videos}')
+        else:
+            audios += 1
+            yield from _iter_playlist_head(f'playlist{i}', 'audio', f'A{audios}')
+        yield from _iter_entries(frames, frame_rate, f'chain{i}')
+        yield '  </playlist>\n'
+
+    yield '  <tractor id="tractor0">\n'
+    yield '    <property name="shotcut">1</property>\n'
+    for name, value in (properties or {}).items():
+        yield f'    <property name={quoteattr(name)}>{escape(str(value))}</property>\n'
+    for i, track in enumerate(tracks):
+        hide = '' if track['video_index'] >= 0 else ' hide="video"'
+        yield f'    <track producer="playlist{i}"{hide}/>\n'
+    for i in range(1, len(tracks)):
+        yield f'    <transition id="transition{i}">\n'
+        yield '      <property name="a_track">0</property>\n'
+        yield f'      <property name="b_track">{i}</property>\n'
+        yield '      <property name="mlt_service">mix</property>\n'
+        yield '      <property name="always_active">1</property>\n'
+        yield '      <property name="sum">1</property>\n'
+        yield '    </transition>\n'
+    yield '  </tractor>\n'
+    yield '</mlt>\n'
+
+
+def write_multitrack_mlt(output_file, tracks, frames, profile=DEFAULT_PROFILE, properties=None):
+    """Write a multi-track MLT project (see iter_multitrack_mlt) with a single buffered write."""
+    text = ''.join(iter_multitrack_mlt(tracks, frames, profile, properties))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def unchanged_entries(previous, frames):
+    """Number of leading (start, end) entries that two frame lists share."""
+    previous = np.asarray(previous, dtype=np.int64).reshape(-1, 2)
+    frames = np.asarray(frames, dtype=np.int64).reshape(-1, 2)
+    count = min(len(previous), len(frames))
+    differs = np.flatnonzero((previous[:count] != frames[:count]).any(axis=1))
+    return int(differs[0]) if len(differs) else count
+
+
+def patch_mlt(output_file, resource, frames, unchanged, length=None, profile=DEFAULT_PROFILE, properties=None):
+    """Update a project written by write_mlt whose first ``unchanged`` entries are still valid.
+
+    The header is rewritten in place (its timecodes have a fixed width) and
+    the file is truncated after the unchanged entries, so only the changed
+    entries and the footer are written. Falls back to write_mlt when the
+    existing file does not have the expected layout.
+    """
+    frame_rate = profile_frame_rate(profile)
+    frames = np.asarray(frames, dtype=np.int64).reshape(-1, 2)
+    if unchanged:
+        head = ''.join(_iter_head(resource, length, frame_rate, profile)).encode()
+        last_kept = ''.join(_iter_entries(frames[unchanged - 1:unchanged], frame_rate)).encode()
+        offset = len(head) + unchanged * ENTRY_BYTES
+        with open(output_file, 'r+b') as f:
+            # The last kept entry must sit exactly where fixed-width lines put it
+            f.seek(offset - ENTRY_BYTES)
+            if f.read(ENTRY_BYTES) == last_kept:
+                f.seek(0)
+                f.write(head)
+                f.seek(offset)
+                f.write(''.join(chain(_iter_entries(frames[unchanged:], frame_rate),
+                                      _iter_tail(properties))).encode())
+                f.truncate()
+                return
+    write_mlt(output_file, resource, frames, length, profile, properties)
@@ -0,0 +1,108 @@
+"""Cut several audio tracks together: one microphone per file, or several audio streams in one file.
+
+Every track is decoded by its own ffmpeg process and analyzed on its own
+thread. A stretch is kept when any track is voiced there, and the combined
+cut list is written as one multi-track MLT project in which all tracks share
+the same cuts.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .audio import DEFAULT_FPS, probe_streams
+from .intervals import IntervalSet, coverage, refine_voiced
+from .pipeline import detect_silent_samples
+from .profiling import NULL_PROFILER
+from .timecode import DEFAULT_PROFILE, profile_frame_rate, samples_to_frames
+
+
+def parse_track(spec):
+    """Split 'FILE' or 'FILE:N' (the N-th audio stream of FILE) into (filename, stream)."""
+    filename, _, stream = spec.rpartition(':')
+    if filename and stream.isdigit():
+        return filename, int(stream)
+    return spec, None
+
+
+def stream_indices(filename, stream=None):
+    """Absolute (audio_index, video_index) of a track's streams in its container, -1 where missing."""
+    streams = probe_streams(filename)
+    audio = [index for index, kind in streams if kind == 'Audio']
+    video = [index for index, kind in streams if kind == 'Video']
+    if not audio or (stream or 0) >= len(audio):
+        raise ValueError(f"{filename} has no audio stream {stream or 0}.")
+    return audio[stream or 0], video[0] if video else -1
+
+
+def detect_multitrack_frames(tracks, threshold=0.01, chunk_size=100, merge_threshold=0.0, metric='magnitude',
+                             fps=DEFAULT_FPS, analysis_fps=None, cache_dir=None, profile=DEFAULT_PROFILE,
+                             pre_roll=0.0, post_roll=0.0, min_keep=0.0, min_cut=0.0, engine='threshold',
+                             engine_options=None, workers=None, profiler=None):
+    """Voiced sections of several tracks combined: kept wherever any track is voiced.
+
+    ``tracks`` are (filename, stream) pairs as returned by parse_track.
+    Each track's silent runs are found concurrently (on up to ``workers``
+    threads) with the options of pipeline.detect_voiced_frames and merged by
+    merge_threshold; the union of the voiced complements is then padded and
+    filtered once and snapped to frames. Returns the voiced IntervalSet in
+    frames, the length of every track in frames and the threshold used for
+    every track.
+    """
+    if not tracks:
+        raise ValueError("No tracks were given.")
+    profiler = profiler or NULL_PROFILER
+
+    def analyze(track):
+        filename, stream = track
+        return detect_silent_samples(filename, threshold, chunk_size, metric, fps, analysis_fps, cache_dir,
+                                     engine, engine_options, stream, profiler)
+
+    with ThreadPoolExecutor(max_workers=workers or len(tracks)) as pool:
+        results = list(pool.map(analyze, tracks))
+
+    # Every track is decoded at the same analysis rate, so sample positions line up
+    sample_rate = results[0][3]
+    nsamples = max(result[2] for result in results)
+    frame_rate = profile_frame_rate(profile)
+    with profiler.stage('intervals'):
+        voiced = [IntervalSet(starts, ends).merge_gaps(round(merge_threshold * sample_rate)).complement(count)
+                  for starts, ends, count, _, _ in results]
+        combined = refine_voiced(coverage(voiced, 1), nsamples, sample_rate, frame_rate, pre_roll, post_roll,
+                                 min_keep, min_cut)
+    profiler.count('intervals', len(combined))
+    lengths = [int(samples_to_frames(result[2], sample_rate, frame_rate)) for result in results]
+    return combined, lengths, [result[4] for result in results]
+
+
+def generate_multitrack_project(tracks, output_file, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                                profile=DEFAULT_PROFILE, profiler=None, **detect_options):
+    """Detect the combined voiced sections of several tracks and save them as a multi-track MLT project.
+
+    ``tracks`` are 'FILE' or 'FILE:N' specs. Each becomes a chain with its
+    audio_index/video_index set to the selected streams; only the first
+    track of a file that has video carries that video, the others are audio
+    tracks. Returns the voiced sections in seconds and the thresholds.
+    """
+    from .mlt import write_multitrack_mlt
+
+    profiler = profiler or NULL_PROFILER
+    tracks = [parse_track(spec) if isinstance(spec, str) else spec for spec in tracks]
+    voiced, lengths, thresholds = detect_multitrack_frames(tracks, threshold, chunk_size, merge_threshold,
+                                                           profile=profile, profiler=profiler, **detect_options)
+    mlt_tracks = []
+    seen_video = set()
+    for (filename, stream), length in zip(tracks, lengths):
+        with profiler.stage('probe'):
+            audio_index, video_index = stream_indices(filename, stream)
+        if filename in seen_video:
+            video_index = -1
+        elif video_index >= 0:
+            seen_video.add(filename)
+        mlt_tracks.append({'resource': filename, 'length': length, 'audio_index': audio_index,
+                           'video_index': video_index})
+    properties = {'video_editor:threshold': ' '.join(f'{value:.6g}' for value in thresholds)}
+    if isinstance(threshold, str):
+        properties['video_editor:threshold_method'] = threshold
+    with profiler.stage('mlt_write'):
+        write_multitrack_mlt(output_file, mlt_tracks, list(voiced), profile, properties)
+    profiler.count('bytes_written', os.path.getsize(output_file))
+    return voiced.to_seconds(profile_frame_rate(profile)), thresholds
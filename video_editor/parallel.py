@@ -0,0 +1,112 @@
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .audio import get_ffmpeg_binary, probe_video_rate
+from .pcm import PcmStore
+from .stream_copy import run_ffmpeg, write_concat_list
+
+
+def split_batches(sections, nbatches):
+    """Split sections into at most nbatches contiguous runs of similar total duration."""
+    if not sections:
+        return []
+    lengths = np.array([end - start for start, end in sections])
+    cumulative = np.cumsum(lengths)
+    targets = cumulative[-1] * np.arange(1, nbatches) / nbatches
+    cuts = np.unique(np.searchsorted(cumulative, targets, side='right'))
+    bounds = [0, *cuts[(cuts > 0) & (cuts < len(sections))].tolist(), len(sections)]
+    return [sections[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def select_expression(sections, offset):
+    """ffmpeg select/aselect expression keeping t in any of the sections (shifted by -offset)."""
+    return '+'.join(f'gte(t,{start - offset:.6f})*lt(t,{end - offset:.6f})' for start, end in sections)
+
+
+def render_batch(input_video, sections, output, preset='medium', crf=18, threads=0, pcm_path=None,
+                 frame_rate=None):
+    """Encode one contiguous batch of sections into its own file.
+
+    The input is seeked to the batch's first section and read only up to
+    its last one, so every worker only decodes its own span of the
+    recording. ``frame_rate`` is the source's (num, den); the output keeps
+    it, and sections on its frames are selected frame-exactly. The audio
+    of the sections is piped to the encoder as PCM, sliced sample-exactly
+    out of the shared PCM store at pcm_path or out of a decode of the span.
+    """
+    from .sequential import CutFrameSource, _pump
+
+    frame_rate = frame_rate or probe_video_rate(input_video)
+    num, den = frame_rate
+    start, end = sections[0][0], sections[-1][1]
+    store = PcmStore(pcm_path) if pcm_path else None
+    frames = [(round(a * num / den), round(b * num / den)) for a, b in sections]
+    source = CutFrameSource(input_video, frames, frame_rate, pcm=store)
+    script = output + '.filter'
+    with open(script, 'w') as f:
+        # Bounds half a frame early, so frames on a section boundary never depend on rounding
+        f.write(f"[0:v]select='{select_expression(sections, start + den / (2 * num))}',setpts=N/FRAME_RATE/TB[v]")
+    args = ['-v', 'error', '-ss', f'{start:.6f}', '-t', f'{end - start:.6f}', '-i', input_video]
+    if source.has_audio:
+        args += ['-f', 's16le', '-ar', str(source.sample_rate), '-ac', str(source.channels), '-i', 'pipe:0',
+                 '-filter_complex_script', script, '-map', '[v]', '-map', '1:a', '-c:a', 'aac']
+    else:
+        args += ['-filter_complex_script', script, '-map', '[v]']
+    # select leaves the output rate unset, and the muxer would fall back to 25 fps and drop frames
+    args += ['-r', f'{num}/{den}', '-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-threads', str(threads),
+             output]
+
+    errors = []
+    with tempfile.TemporaryFile() as log:
+        proc = subprocess.Popen([get_ffmpeg_binary(), '-hide_banner', '-y', *args], stdin=subprocess.PIPE,
+                                stdout=subprocess.DEVNULL, stderr=log)
+        try:
+            if source.has_audio:
+                _pump(source.audio_blocks(), proc.stdin, errors)
+            else:
+                proc.stdin.close()
+        finally:
+            if store is not None:
+                store.close()
+        if proc.wait() != 0:
+            log.seek(0)
+            raise IOError(f"ffmpeg failed to encode {output}:\n{log.read().decode('utf8', 'replace')}")
+    if errors:
+        raise errors[0]
+    return output
+
+
+def render_parallel(input_video, output_video, sections, workers=None, preset='medium', crf=18,
+                    threads=None, workdir=None, pcm_path=None):
+    """Re-encode the non-silent sections on a pool of worker processes.
+
+    The sections are divided into one contiguous batch per worker, each
+    batch is encoded by its own ffmpeg process and the pieces are joined
+    with the concat demuxer without another encode. With pcm_path, every
+    worker maps the same PCM store for its audio.
+    """
+    if not sections:
+        raise ValueError("No non-silent sections were detected.")
+    workers = workers or os.cpu_count() or 1
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+    frame_rate = probe_video_rate(input_video)
+    if frame_rate is None:
+        raise ValueError(f"{input_video} has no video stream.")
+    batches = split_batches(sections, workers)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        outputs = [os.path.join(tmp, f'batch{i:04d}.mp4') for i in range(len(batches))]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pieces = list(pool.map(render_batch, [input_video] * len(batches), batches, outputs,
+                                   [preset] * len(batches), [crf] * len(batches), [threads] * len(batches),
+                                   [pcm_path] * len(batches), [frame_rate] * len(batches)))
+
+        list_path = os.path.join(tmp, 'concat.txt')
+        write_concat_list(list_path, [(piece, None, None) for piece in pieces])
+        run_ffmpeg('-v', 'error', '-f', 'concat', '-safe', '0', '-i', list_path,
+                   '-c', 'copy', '-movflags', '+faststart', output_video)
@@ -0,0 +1,172 @@
+"""Decoded audio kept on disk as raw PCM and opened as a memory map.
+
+The first stage that needs the audio decodes it once into a PCM store: a
+64-byte header (magic, sample rate, channels, dtype, sample count) followed
+by interleaved samples. Analysis, the renderer and its worker processes then
+open the same file with np.memmap, getting zero-copy random access without
+starting ffmpeg again; the pages are shared through the OS page cache.
+"""
+import collections
+import contextlib
+import os
+import struct
+import subprocess
+import tempfile
+
+import numpy as np
+
+from .audio import get_ffmpeg_binary
+
+MAGIC = b'VEPCM\x00\x00\x01'
+HEADER = struct.Struct('<8sIH8sQ')  # magic, rate, channels, dtype string, samples per channel
+HEADER_BYTES = 64
+DEFAULT_RATE = 48000
+DEFAULT_CHANNELS = 2
+
+# How many PcmStores have each path open in this process; cache eviction leaves those files alone
+_open_paths = collections.Counter()
+
+
+def open_store_paths():
+    """Absolute paths of the PCM stores currently open in this process."""
+    return set(_open_paths)
+
+
+class PcmStore:
+    """A PCM store opened read-only; ``samples`` is a (nsamples, channels) memmap."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_BYTES)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a PCM store.")
+        _, self.rate, self.channels, dtype, self.nsamples = HEADER.unpack_from(header)
+        self.dtype = np.dtype(dtype.rstrip(b'\0').decode())
+        if self.nsamples:
+            self.samples = np.memmap(path, dtype=self.dtype, mode='r', offset=HEADER_BYTES,
+                                     shape=(self.nsamples, self.channels))
+        else:
+            self.samples = np.empty((0, self.channels), dtype=self.dtype)
+        self._open_path = os.path.abspath(path)
+        _open_paths[self._open_path] += 1
+
+    def __len__(self):
+        return self.nsamples
+
+    @property
+    def duration(self):
+        return self.nsamples / self.rate
+
+    def iter_blocks(self, block_size=1 << 16, start=0, end=None, mono=True):
+        """Yield consecutive blocks of samples[start:end].
+
+        With mono, multi-channel audio is mixed down to floats in [-1, 1]
+        (the same average ffmpeg's -ac 1 takes); mono int16 is yielded as
+        views of the map.
+        """
+        end = self.nsamples if end is None else min(end, self.nsamples)
+        for position in range(start, end, block_size):
+            block = self.samples[position:min(position + block_size, end)]
+            if not mono:
+                yield block
+            elif self.channels == 1:
+                yield block[:, 0]
+            else:
+                yield block.mean(axis=1) * (1.0 / 32768)
+
+    def close(self):
+        """Release the map (needed before the file can be removed on Windows)."""
+        mmap = getattr(self.samples, '_mmap', None)
+        self.samples = None
+        if mmap is not None:
+            mmap.close()
+        if self._open_path:
+            _open_paths[self._open_path] -= 1
+            if not _open_paths[self._open_path]:
+                del _open_paths[self._open_path]
+            self._open_path = None
+
+
+def write_pcm_stores(filename, outputs, stream=None):
+    """Decode the audio of filename once into PCM stores at (path, rate, channels) each and open them.
+
+    ffmpeg resamples its single decode for every output and writes the
+    samples straight into each store's file. The files are written under
+    temporary names and renamed when complete, so readers never see a
+    partial store.
+    """
+    select = ['-map', f'0:a:{stream}'] if stream is not None else []
+    cmd = [get_ffmpeg_binary(), '-v', 'error', '-nostdin', '-i', filename]
+    pending = []
+    try:
+        for path, rate, channels in outputs:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+            pending.append((fd, tmp))
+            # ffmpeg writes after the header, from the descriptor's position
+            os.write(fd, bytes(HEADER_BYTES))
+            cmd += [*select, '-vn', '-sn', '-dn', '-ac', str(channels), '-ar', str(rate),
+                    '-f', 's16le', '-acodec', 'pcm_s16le', f'pipe:{fd}']
+        proc = subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                              pass_fds=[fd for fd, _ in pending])
+        if proc.returncode != 0:
+            raise IOError(f"ffmpeg failed to decode the audio of {filename}:\n"
+                          f"{proc.stderr.decode('utf8', 'replace')}")
+        for (fd, tmp), (path, rate, channels) in zip(pending, outputs):
+            nsamples = (os.fstat(fd).st_size - HEADER_BYTES) // (2 * channels)
+            if not nsamples:
+                raise ValueError("The video has no audio track.")
+            os.pwrite(fd, HEADER.pack(MAGIC, rate, channels, np.dtype('<i2').str.encode(), nsamples), 0)
+        for path, _, _ in outputs:
+            fd, tmp = pending.pop(0)
+            os.close(fd)
+            try:
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+    finally:
+        for fd, tmp in pending:
+            os.close(fd)
+            os.unlink(tmp)
+    return [PcmStore(path) for path, _, _ in outputs]
+
+
+def write_pcm_store(path, filename, rate=DEFAULT_RATE, channels=DEFAULT_CHANNELS, stream=None):
+    """Decode the audio of filename into a PCM store at path and open it."""
+    return write_pcm_stores(filename, [(path, rate, channels)], stream)[0]
+
+
+@contextlib.contextmanager
+def open_pcm_stores(filename, formats, cache_dir=None, stream=None):
+    """Context manager giving a PcmStore of filename's audio for each (rate, channels) in formats.
+
+    The stores that have to be written come from one decode. With a
+    cache_dir they are entries of the envelope cache there, kept between
+    runs and evicted with the envelopes; otherwise they live in a temporary
+    directory that is removed when the block exits.
+    """
+    if cache_dir:
+        from .cache import EnvelopeCache
+        stores = EnvelopeCache(cache_dir).load_or_decode_pcms(filename, formats, stream)
+        try:
+            yield stores
+        finally:
+            for store in stores:
+                store.close()
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = [(os.path.join(tmp, f'audio{i}.pcm'), rate, channels) for i, (rate, channels) in enumerate(formats)]
+        stores = write_pcm_stores(filename, outputs, stream)
+        try:
+            yield stores
+        finally:
+            for store in stores:
+                store.close()
+
+
+@contextlib.contextmanager
+def open_pcm_store(filename, rate=DEFAULT_RATE, channels=DEFAULT_CHANNELS, cache_dir=None, stream=None):
+    """Context manager giving one PcmStore of filename's audio (see open_pcm_stores)."""
+    with open_pcm_stores(filename, [(rate, channels)], cache_dir, stream) as stores:
+        yield stores[0]
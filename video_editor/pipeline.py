@@ -0,0 +1,207 @@
+import contextlib
+import os
+
+from .audio import DEFAULT_FPS, probe_video_rate, probe_video_size
+from .detection import DETECTORS, track_silence_in_file
+from .intervals import voiced_frames
+from .profiling import NULL_PROFILER
+from .timecode import DEFAULT_PROFILE, frames_to_seconds, profile_frame_rate, samples_to_frames
+
+EXPORT_MODES = ('reencode', 'sequential', 'parallel', 'keyframe', 'smart')
+
+
+def detect_silent_samples(input_video, threshold=0.01, chunk_size=100, metric='magnitude', fps=DEFAULT_FPS,
+                          analysis_fps=None, cache_dir=None, engine='threshold', engine_options=None, stream=None,
+                          profiler=None, pcm=None):
+    """Silent runs of one audio stream in analysis samples (see detect_voiced_frames for the options).
+
+    Returns the run starts and ends, the number of samples, the analysis
+    rate and the threshold that was used. ``stream`` picks the N-th audio
+    stream of the file; ``pcm`` is a PcmStore of it to read instead of
+    decoding, which sets the analysis rate to the store's.
+    """
+    if engine not in DETECTORS:
+        raise ValueError(f"Unknown detection engine: {engine!r}")
+    profiler = profiler or NULL_PROFILER
+    if cache_dir or engine != 'threshold' or isinstance(threshold, str):
+        if cache_dir:
+            from .cache import EnvelopeCache
+            with profiler.stage('envelope_cache'):
+                envelope = EnvelopeCache(cache_dir).load_or_compute(input_video, chunk_size, fps, metric,
+                                                                    analysis_fps, stream, pcm)
+        else:
+            from .envelope import compute_envelope
+            envelope = compute_envelope(input_video, chunk_size, fps, metric, analysis_fps, stream=stream,
+                                        profiler=profiler, pcm=pcm)
+        with profiler.stage('detect'):
+            if isinstance(threshold, str):
+                threshold = envelope.auto_threshold(threshold)
+            silent_starts, silent_ends = envelope.detect(DETECTORS[engine](threshold, **(engine_options or {})))
+        return silent_starts, silent_ends, envelope.nsamples, envelope.analysis_fps, threshold
+    tracker = track_silence_in_file(input_video, threshold, chunk_size, fps, metric, analysis_fps=analysis_fps,
+                                    stream=stream, profiler=profiler, pcm=pcm)
+    silent_starts, silent_ends = zip(*tracker.silent_samples) if tracker.silent_samples else ((), ())
+    return silent_starts, silent_ends, tracker.samples_seen, tracker.analysis_fps, threshold
+
+
+def detect_voiced_frames(input_video, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                         metric='magnitude', fps=DEFAULT_FPS, analysis_fps=None, cache_dir=None,
+                         profile=DEFAULT_PROFILE, pre_roll=0.0, post_roll=0.0, min_keep=0.0, min_cut=0.0,
+                         engine='threshold', engine_options=None, profiler=None, pcm=None, frame_rate=None):
+    """Detect silence and return the voiced sections as frame ranges of the MLT profile.
+
+    ``engine`` names one of detection.DETECTORS, built with ``threshold``
+    and ``engine_options``. ``threshold`` may also be one of
+    detection.AUTO_THRESHOLDS to pick it from the envelope's histogram.
+    With a cache_dir the envelope is loaded from (or stored in) the envelope
+    cache; otherwise the audio is streamed once, through an Envelope unless
+    a fixed threshold is all that is needed. Silent runs are merged,
+    complemented, padded by pre_roll/post_roll and filtered by min_keep /
+    min_cut (all in seconds) in integer samples, and only then snapped to
+    frames. Returns the voiced IntervalSet in frames, the length of the
+    audio in frames and the threshold that was used. Every step is timed on
+    the optional profiler (see profiling.Profiler). With a PcmStore as
+    ``pcm`` the audio is read from it instead of being decoded. A (num, den)
+    ``frame_rate`` replaces the profile's.
+    """
+    profiler = profiler or NULL_PROFILER
+    silent_starts, silent_ends, nsamples, sample_rate, threshold = detect_silent_samples(
+        input_video, threshold, chunk_size, metric, fps, analysis_fps, cache_dir, engine, engine_options,
+        profiler=profiler, pcm=pcm)
+    frame_rate = frame_rate or profile_frame_rate(profile)
+    with profiler.stage('intervals'):
+        voiced = voiced_frames(silent_starts, silent_ends, nsamples, sample_rate, frame_rate, merge_threshold,
+                               pre_roll, post_roll, min_keep, min_cut)
+    profiler.count('intervals', len(voiced))
+    return voiced, int(samples_to_frames(nsamples, sample_rate, frame_rate)), threshold
+
+
+def detect_voiced_sections(input_video, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                           profile=DEFAULT_PROFILE, **detect_options):
+    """Detect silence, merge silent runs closer than merge_threshold and return the voiced sections.
+
+    Section boundaries fall on frames of the MLT profile. Returns the voiced
+    sections and the audio duration in seconds.
+    """
+    voiced, length, _ = detect_voiced_frames(input_video, threshold, chunk_size, merge_threshold,
+                                             profile=profile, **detect_options)
+    frame_rate = profile_frame_rate(profile)
+    return voiced.to_seconds(frame_rate), float(frames_to_seconds(length, frame_rate))
+
+
+def _threshold_properties(threshold, used_threshold):
+    properties = {'video_editor:threshold': f'{used_threshold:.6g}'}
+    if isinstance(threshold, str):
+        properties['video_editor:threshold_method'] = threshold
+    return properties
+
+
+def detect_cut_list(input_video, threshold=0.01, chunk_size=100, merge_threshold=0.0, cache_dir=None,
+                    profile=DEFAULT_PROFILE, profiler=None, **detect_options):
+    """Detect silence and return the voiced sections as a format-neutral CutList.
+
+    The threshold that was used (picked automatically for 'otsu' / 'gmm')
+    is recorded in the cut list's properties, and the source's frame rate
+    and size for the exporters that address its frames; any exporter in
+    video_editor.export can write the result.
+    """
+    from .cutlist import CutList
+
+    voiced, length, used_threshold = detect_voiced_frames(input_video, threshold, chunk_size, merge_threshold,
+                                                          cache_dir=cache_dir, profile=profile, profiler=profiler,
+                                                          **detect_options)
+    return CutList(input_video, voiced, length, profile, _threshold_properties(threshold, used_threshold),
+                   probe_video_rate(input_video), probe_video_size(input_video))
+
+
+def generate_shotcut_project(input_video, output_file, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                             cache_dir=None, profile=DEFAULT_PROFILE, profiler=None, **detect_options):
+    """Detect silence, calculate voiced sections, and save them as an MLT project.
+
+    The threshold that was used (picked automatically for 'otsu' / 'gmm')
+    is stored as a property of the project's tractor. Returns the voiced
+    sections in seconds and that threshold.
+    """
+    from .cutlist import CutList
+    from .export import export_mlt
+
+    profiler = profiler or NULL_PROFILER
+    voiced, length, used_threshold = detect_voiced_frames(input_video, threshold, chunk_size, merge_threshold,
+                                                          cache_dir=cache_dir, profile=profile, profiler=profiler,
+                                                          **detect_options)
+    cut_list = CutList(input_video, voiced, length, profile, _threshold_properties(threshold, used_threshold))
+    with profiler.stage('mlt_write'):
+        export_mlt(cut_list, output_file)
+    profiler.count('bytes_written', os.path.getsize(output_file))
+    return cut_list.sections(), used_threshold
+
+
+def remove_silence(input_video, output_file, threshold=0.01, chunk_size=100, merge_threshold=0.0,
+                   export_mode='reencode', workers=None, preset='medium', cache_dir=None, profiler=None,
+                   pcm_store=False, **detect_options):
+    """Detect silence and render a video containing only the voiced sections.
+
+    export_mode picks the renderer: 'reencode' (MoviePy, one core),
+    'sequential' (one front-to-back decode piped into one encoder),
+    'parallel' (batches on a process pool), or 'keyframe' / 'smart'
+    (ffmpeg stream copy). With pcm_store the audio is decoded once into two
+    memory-mapped PCM stores (kept in cache_dir when there is one): mono at
+    the analysis rate, which the analysis reads so that the cuts come out
+    the same as without it, and 48 kHz stereo, which every renderer but
+    'reencode' reads instead of decoding the audio again; 'reencode' cannot
+    be combined with pcm_store. Cuts are snapped to the input's own frames
+    and the output keeps its frame rate. Returns the voiced sections and the
+    threshold that was used.
+    """
+    if export_mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode: {export_mode!r}")
+    if pcm_store and export_mode == 'reencode':
+        raise ValueError("The 'reencode' mode decodes through MoviePy and cannot read a PCM store.")
+    profiler = profiler or NULL_PROFILER
+    frame_rate = probe_video_rate(input_video)
+    if frame_rate is None:
+        raise ValueError(f"{input_video} has no video stream.")
+    with contextlib.ExitStack() as stack:
+        pcm = analysis_pcm = None
+        if pcm_store:
+            from .pcm import DEFAULT_CHANNELS, DEFAULT_RATE, open_pcm_stores
+            analysis_rate = detect_options.get('analysis_fps') or detect_options.get('fps', DEFAULT_FPS)
+            formats = [(analysis_rate, 1), (DEFAULT_RATE, DEFAULT_CHANNELS)]
+            with profiler.stage('pcm_store'):
+                analysis_pcm, pcm = stack.enter_context(open_pcm_stores(input_video, formats, cache_dir=cache_dir))
+        voiced, _, used_threshold = detect_voiced_frames(input_video, threshold, chunk_size, merge_threshold,
+                                                         cache_dir=cache_dir, profiler=profiler, pcm=analysis_pcm,
+                                                         frame_rate=frame_rate, **detect_options)
+        non_silent_sections = voiced.to_seconds(frame_rate)
+        if not non_silent_sections:
+            raise ValueError("No non-silent sections were detected.")
+
+        if export_mode == 'sequential':
+            # Decode once in order and drop the frames and samples of the cuts
+            from .sequential import render_sequential
+            with profiler.stage('render'):
+                render_sequential(input_video, output_file, list(voiced), frame_rate, preset, pcm=pcm)
+        elif export_mode == 'parallel':
+            # Encode contiguous batches of sections on a process pool
+            from .parallel import render_parallel
+            with profiler.stage('render'):
+                render_parallel(input_video, output_file, non_silent_sections, workers=workers, preset=preset,
+                                pcm_path=pcm.path if pcm else None)
+        elif export_mode in ('keyframe', 'smart'):
+            # Cut with ffmpeg stream copy instead of re-encoding every frame
+            from .stream_copy import export_stream_copy
+            with profiler.stage('render'):
+                export_stream_copy(input_video, output_file, non_silent_sections, mode=export_mode, pcm=pcm)
+        else:
+            from moviepy.editor import VideoFileClip, concatenate_videoclips
+
+            with profiler.stage('open'):
+                video_clip = VideoFileClip(input_video)
+            with profiler.stage('subclips'):
+                non_silent_clips = [video_clip.subclip(start, min(end, video_clip.duration))
+                                    for start, end in non_silent_sections]
+                final_clip = concatenate_videoclips(non_silent_clips)
+            with profiler.stage('render'):
+                final_clip.write_videofile(output_file, codec='libx264', preset=preset)
+    profiler.count('bytes_written', os.path.getsize(output_file))
+    return non_silent_sections, used_threshold
@@ -0,0 +1,131 @@
+"""Stage timers, counters and peak memory for one run, reported as JSON.
+
+Pipeline functions take an optional ``profiler``. Without one they run
+exactly as before, with one every step is timed under a stage name
+('decode', 'windows', 'detect', 'intervals', 'mlt_write', 'render', ...)
+and the work is counted (samples decoded, windows evaluated, intervals
+produced, bytes written). Stages that run on several threads at once add up
+their time, so they can exceed the wall clock.
+"""
+import contextlib
+import cProfile
+import json
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss(who='self'):
+    """Peak resident set size in bytes of this process ('self') or its waited-for children, or None.
+
+    For children this is the largest single child (ffmpeg, render workers),
+    not their sum.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF if who == 'self' else resource.RUSAGE_CHILDREN)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+class Profiler:
+    """Accumulates stage times and counters; usable from several threads.
+
+    Used as a context manager it times the whole run and, with
+    ``cprofile``, runs cProfile over it as well (on the calling thread).
+    """
+
+    def __init__(self, cprofile=False):
+        self.stages = {}  # name -> [seconds, calls]
+        self.counters = {}
+        self.wall_seconds = None
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._lock = threading.Lock()
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        if self._cprofile:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._cprofile:
+            self._cprofile.disable()
+        self.wall_seconds = time.perf_counter() - self._started
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds, calls=1):
+        with self._lock:
+            stage = self.stages.setdefault(name, [0.0, 0])
+            stage[0] += seconds
+            stage[1] += calls
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def timed(self, name, iterable):
+        """Yield from iterable, adding the time spent waiting for each item to stage ``name``."""
+        iterator = iter(iterable)
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - started)
+                return
+            self.add_time(name, time.perf_counter() - started)
+            yield item
+
+    def report(self):
+        """The run as a JSON-serializable dict."""
+        with self._lock:
+            stages = {name: {'seconds': round(seconds, 6), 'calls': calls}
+                      for name, (seconds, calls) in self.stages.items()}
+            counters = dict(self.counters)
+        return {'wall_seconds': None if self.wall_seconds is None else round(self.wall_seconds, 6),
+                'stages': stages, 'counters': counters,
+                'peak_rss_bytes': peak_rss('self'), 'peak_children_rss_bytes': peak_rss('children')}
+
+    def write_report(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+            f.write('\n')
+
+    def dump_cprofile(self, path):
+        """Write the cProfile stats (readable with pstats or snakeviz)."""
+        if self._cprofile is None:
+            raise ValueError("This profiler was created without cprofile.")
+        self._cprofile.dump_stats(path)
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every call is a no-op."""
+
+    def stage(self, name):
+        return contextlib.nullcontext()
+
+    def add_time(self, name, seconds, calls=1):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def timed(self, name, iterable):
+        return iterable
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,185 @@
+"""Render the voiced sections with one front-to-back decode of the input.
+
+Cutting with subclips seeks the decoder back and forth, and every seek can
+restart decoding at the previous keyframe. Here the video is decoded once,
+in order, at its own frame rate, and frames inside silent intervals
+are simply not passed on; the audio is decoded once the same way and the
+samples of the silent intervals dropped. The kept frames and samples are
+piped into a single ffmpeg encoder, so rendering costs one linear decode
+plus the encode.
+"""
+import os
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+from .audio import get_ffmpeg_binary, iter_pcm_blocks, probe_streams, probe_video_rate, probe_video_size
+
+AUDIO_RATE = 48000
+AUDIO_CHANNELS = 2
+
+
+def frames_to_samples(frames, frame_rate, sample_rate):
+    """Sample position of each frame boundary, rounded to nearest in integer arithmetic."""
+    num, den = frame_rate
+    frames = np.asarray(frames, dtype=np.int64)
+    return (2 * frames * sample_rate * den + num) // (2 * num)
+
+
+class CutFrameSource:
+    """Sequential decode of a media file that yields only the frames and samples inside ``frames``.
+
+    ``frames`` are sorted (start, end) frame ranges at ``frame_rate``, end
+    exclusive. The video is decoded as raw yuv420p, resampled to the frame
+    rate by ffmpeg's fps filter so frame numbers match the cut list, and
+    decoding stops after the last kept frame. With a PcmStore as ``pcm``,
+    the audio is sliced straight out of it instead of being decoded.
+    """
+
+    def __init__(self, filename, frames, frame_rate, sample_rate=AUDIO_RATE, channels=AUDIO_CHANNELS, pcm=None):
+        self.filename = filename
+        frames = np.asarray(frames, dtype=np.int64).reshape(-1, 2)
+        self.starts, self.ends = frames[:, 0], frames[:, 1]
+        self.frame_rate = frame_rate
+        self.pcm = pcm
+        self.sample_rate = pcm.rate if pcm else sample_rate
+        self.channels = pcm.channels if pcm else channels
+        self.size = probe_video_size(filename)
+        self.has_audio = any(kind == 'Audio' for _, kind in probe_streams(filename))
+
+    def video_frames(self):
+        """Yield every kept frame as a memoryview of raw yuv420p; each is only valid until the next."""
+        if not len(self.starts):
+            return
+        width, height = self.size
+        frame_bytes = width * height * 3 // 2
+        num, den = self.frame_rate
+        cmd = [get_ffmpeg_binary(), '-v', 'error', '-nostdin', '-i', self.filename, '-map', '0:v:0',
+               '-vf', f'fps={num}/{den}', '-f', 'rawvideo', '-pix_fmt', 'yuv420p', '-']
+        buffer = bytearray(frame_bytes)
+        view = memoryview(buffer)
+        last = int(self.ends[-1])
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        try:
+            section = 0
+            for index in range(last):
+                filled = 0
+                while filled < frame_bytes:
+                    nread = proc.stdout.readinto(view[filled:])
+                    if not nread:
+                        break
+                    filled += nread
+                if filled < frame_bytes:
+                    break
+                while index >= self.ends[section]:
+                    section += 1
+                if index >= self.starts[section]:
+                    yield view
+        finally:
+            # Everything after the last kept frame is left undecoded
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            error = proc.stderr.read().decode('utf8', 'replace')
+            proc.stderr.close()
+            proc.stdout.close()
+            if proc.returncode not in (0, -9) and error:
+                raise IOError(f"ffmpeg failed to decode the video of {self.filename}:\n{error}")
+
+    def audio_blocks(self, block_size=1 << 16):
+        """Yield the kept audio as (samples, channels) int16 blocks of interleaved PCM."""
+        if not len(self.starts):
+            return
+        sample_starts = frames_to_samples(self.starts, self.frame_rate, self.sample_rate)
+        sample_ends = frames_to_samples(self.ends, self.frame_rate, self.sample_rate)
+        if self.pcm:
+            for start, end in zip(sample_starts.tolist(), sample_ends.tolist()):
+                yield from self.pcm.iter_blocks(block_size, start, end, mono=False)
+            return
+        # Decoding starts at the first kept sample; ffmpeg's seek is sample-exact for audio
+        position = int(sample_starts[0])
+        blocks = iter_pcm_blocks(self.filename, self.sample_rate, block_size, start_sample=position,
+                                 channels=self.channels)
+        try:
+            for block in blocks:
+                block_end = position + len(block)
+                # Sections overlapping this block, clipped to it
+                first = np.searchsorted(sample_ends, position, side='right')
+                stop = np.searchsorted(sample_starts, block_end, side='left')
+                for start, end in zip(sample_starts[first:stop].tolist(), sample_ends[first:stop].tolist()):
+                    yield block[max(start, position) - position:min(end, block_end) - position]
+                position = block_end
+                if position >= sample_ends[-1]:
+                    break
+        finally:
+            blocks.close()
+
+
+def _pump(chunks, stream, errors):
+    try:
+        for chunk in chunks:
+            stream.write(chunk)
+    except BrokenPipeError:
+        pass  # the encoder failed; its own error is reported
+    except Exception as error:
+        errors.append(error)
+    finally:
+        # Stops the decoder as well when the encoder went away early
+        chunks.close()
+        try:
+            stream.close()
+        except BrokenPipeError:
+            pass
+
+
+def render_sequential(input_video, output_file, frames, frame_rate=None, preset='medium', crf=18, threads=0,
+                      pcm=None):
+    """Encode the voiced frame ranges of input_video into output_file with one pass over the input.
+
+    ``frames`` are (start, end) frame ranges at ``frame_rate``, which
+    defaults to the input's own (num, den) rate; the output has that rate.
+    Video and audio are fed to the encoder from two threads, the audio
+    through an extra pipe, so neither stream waits for the other. ``pcm``
+    is an optional PcmStore to take the audio from.
+    """
+    frame_rate = frame_rate or probe_video_rate(input_video)
+    source = CutFrameSource(input_video, frames, frame_rate, pcm=pcm)
+    if source.size is None:
+        raise ValueError(f"{input_video} has no video stream.")
+    if not len(source.starts):
+        raise ValueError("No non-silent sections were detected.")
+    width, height = source.size
+    num, den = frame_rate
+
+    cmd = [get_ffmpeg_binary(), '-v', 'error', '-nostdin', '-y',
+           '-f', 'rawvideo', '-pix_fmt', 'yuv420p', '-s', f'{width}x{height}', '-framerate', f'{num}/{den}',
+           '-i', 'pipe:0']
+    audio_read = audio_write = None
+    if source.has_audio:
+        audio_read, audio_write = os.pipe()
+        cmd += ['-f', 's16le', '-ar', str(source.sample_rate), '-ac', str(source.channels),
+                '-i', f'pipe:{audio_read}', '-map', '0:v', '-map', '1:a', '-c:a', 'aac']
+    cmd += ['-c:v', 'libx264', '-preset', preset, '-crf', str(crf), '-threads', str(threads),
+            '-pix_fmt', 'yuv420p', '-movflags', '+faststart', output_file]
+
+    errors = []
+    with tempfile.TemporaryFile() as log:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=log,
+                                pass_fds=(audio_read,) if source.has_audio else ())
+        pumps = [threading.Thread(target=_pump, args=(source.video_frames(), proc.stdin, errors))]
+        if source.has_audio:
+            os.close(audio_read)
+            pumps.append(threading.Thread(target=_pump, args=(source.audio_blocks(), open(audio_write, 'wb'),
+                                                              errors)))
+        for pump in pumps:
+            pump.start()
+        for pump in pumps:
+            pump.join()
+        returncode = proc.wait()
+        if returncode != 0:
+            log.seek(0)
+            raise IOError(f"ffmpeg failed to encode {output_file}:\n{log.read().decode('utf8', 'replace')}")
+    if errors:
+        raise errors[0]
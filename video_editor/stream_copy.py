@@ -0,0 +1,209 @@
+import bisect
+import os
+import re
+import subprocess
+import tempfile
+
+from .audio import get_ffmpeg_binary, probe_codec, probe_duration, probe_streams, probe_video_rate
+
+# Cuts closer than this to a keyframe are treated as landing on it
+KEYFRAME_TOLERANCE = 1e-3
+# Encoder for the re-encoded pieces of smart rendering, by the codec of the source video
+SMART_ENCODERS = {'h264': 'libx264'}
+
+
+def run_ffmpeg(*args):
+    """Run ffmpeg with the given arguments and return its stderr."""
+    proc = subprocess.run([get_ffmpeg_binary(), '-hide_banner', '-nostdin', '-y', *args],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    error = proc.stderr.decode('utf8', 'replace')
+    if proc.returncode != 0:
+        raise IOError(f"ffmpeg {' '.join(args)} failed:\n{error}")
+    return error
+
+
+def probe_keyframes(filename):
+    """Presentation times in seconds of the keyframes of the first video stream.
+
+    Only keyframes are decoded (-skip_frame nokey), so this is much cheaper
+    than a full decode and needs nothing beyond the ffmpeg binary.
+    """
+    log = run_ffmpeg('-skip_frame', 'nokey', '-i', filename, '-map', '0:v:0', '-an', '-sn',
+                     '-vf', 'showinfo', '-f', 'null', '-')
+    return sorted(float(t) for t in re.findall(r'Parsed_showinfo.*?pts_time:\s*([-\d.]+)', log))
+
+
+def _quote(path):
+    """Quote a path for an ffmpeg concat list."""
+    return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+
+def write_concat_list(path, entries):
+    """Write a concat demuxer list of (filename, inpoint, outpoint) entries.
+
+    inpoint/outpoint may be None to use the whole file.
+    """
+    with open(path, 'w') as f:
+        for filename, inpoint, outpoint in entries:
+            f.write(f"file {_quote(filename)}\n")
+            if inpoint is not None:
+                f.write(f"inpoint {inpoint:.6f}\n")
+            if outpoint is not None:
+                f.write(f"outpoint {outpoint:.6f}\n")
+
+
+def snap_to_frames(sections, frame_rate):
+    """Round (start, end) seconds to the nearest frames at frame_rate and return them as frame pairs.
+
+    Sections that become empty are dropped and touching ones merged.
+    """
+    num, den = frame_rate
+    frames = []
+    for start, end in sections:
+        start, end = round(start * num / den), round(end * num / den)
+        if end <= start:
+            continue
+        if frames and start <= frames[-1][1]:
+            frames[-1] = (frames[-1][0], max(end, frames[-1][1]))
+        else:
+            frames.append((start, end))
+    return frames
+
+
+def snap_to_keyframes(sections, keyframes, duration=None):
+    """Widen every section to whole GOPs: its start back to the keyframe at or before it, its end on to the next.
+
+    A section ending after the last keyframe runs to ``duration`` (or keeps
+    its end when that is unknown). Sections that touch or overlap after
+    snapping are merged, so the result can be cut with pure stream copy; it
+    keeps a little more than requested but never drops voiced audio.
+    """
+    snapped = []
+    for start, end in sections:
+        index = bisect.bisect_right(keyframes, start + KEYFRAME_TOLERANCE) - 1
+        start = keyframes[index] if index >= 0 else 0.0
+        index = bisect.bisect_left(keyframes, end - KEYFRAME_TOLERANCE)
+        end = keyframes[index] if index < len(keyframes) else (duration or end)
+        if snapped and start <= snapped[-1][1]:
+            snapped[-1] = (snapped[-1][0], max(end, snapped[-1][1]))
+        else:
+            snapped.append((start, end))
+    return snapped
+
+
+def smart_pieces(sections, keyframes):
+    """Split sections into ('encode' | 'copy', start, end) pieces.
+
+    Only whole GOPs are copied: the head of a section up to its first
+    keyframe and the tail after its last one are re-encoded, since packets
+    cut mid-GOP carry reordered frames from past the cut.
+    """
+    pieces = []
+    for start, end in sections:
+        first = bisect.bisect_left(keyframes, start - KEYFRAME_TOLERANCE)
+        last = bisect.bisect_right(keyframes, end + KEYFRAME_TOLERANCE) - 1
+        copy_start = keyframes[first] if first < len(keyframes) else end
+        copy_end = min(keyframes[last], end) if last >= 0 else start
+        if copy_end - copy_start <= KEYFRAME_TOLERANCE:
+            pieces.append(('encode', start, end))
+            continue
+        if copy_start - start > KEYFRAME_TOLERANCE:
+            pieces.append(('encode', start, copy_start))
+        pieces.append(('copy', copy_start, copy_end))
+        if end - copy_end > KEYFRAME_TOLERANCE:
+            pieces.append(('encode', copy_end, end))
+    return pieces
+
+
+def _cut_piece(input_video, piece, start, frame_count, codec_args):
+    """Write frame_count video frames of input_video from start (all the rest for None) to piece."""
+    # A frame count rather than a duration: a copied GOP's last packets in decode order are the next
+    # keyframe and the frames reordered before it, and rounding must never add a frame
+    count = ['-frames:v', str(frame_count)] if frame_count is not None else []
+    run_ffmpeg('-v', 'error', '-ss', f'{start:.6f}', '-i', input_video, '-map', '0:v:0', '-an', *count, *codec_args,
+               '-video_track_timescale', '90000', piece)
+
+
+def _mux_kept_audio(input_video, list_path, frames, frame_rate, output_video, pcm=None):
+    """Join the video pieces of a concat list with the kept audio of input_video, decoded and encoded once.
+
+    The audio of the kept frames is sliced out of one sample-exact decode
+    (or out of the PcmStore ``pcm``) and piped to the muxer, so its codec
+    never has to match the copied video.
+    """
+    from .sequential import CutFrameSource, _pump
+
+    source = CutFrameSource(input_video, frames, frame_rate, pcm=pcm)
+    audio_read, audio_write = os.pipe()
+    cmd = [get_ffmpeg_binary(), '-v', 'error', '-nostdin', '-y', '-f', 'concat', '-safe', '0', '-i', list_path,
+           '-f', 's16le', '-ar', str(source.sample_rate), '-ac', str(source.channels), '-i', f'pipe:{audio_read}',
+           '-map', '0:v:0', '-map', '1:a', '-c:v', 'copy', '-c:a', 'aac', '-movflags', '+faststart', output_video]
+    errors = []
+    with tempfile.TemporaryFile() as log:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stderr=log, pass_fds=(audio_read,))
+        os.close(audio_read)
+        _pump(source.audio_blocks(), open(audio_write, 'wb'), errors)
+        if proc.wait() != 0:
+            log.seek(0)
+            raise IOError(f"ffmpeg failed to mux {output_video}:\n{log.read().decode('utf8', 'replace')}")
+    if errors:
+        raise errors[0]
+
+
+def export_stream_copy(input_video, output_video, sections, mode='smart', preset='veryfast', crf=18,
+                       workdir=None, pcm=None):
+    """Cut the given (start, end) sections out of input_video without a full re-encode.
+
+    Cuts are first rounded to the source's frames. 'keyframe' widens every
+    section to whole GOPs and stream-copies them. 'smart' keeps the cuts
+    exact by re-encoding only the partial GOPs at either end of each
+    section, in the source's codec (see SMART_ENCODERS), and stream-copying
+    the whole GOPs between them. Either way the video pieces are joined with
+    the concat demuxer and the kept audio is decoded and encoded once as
+    AAC, since audio packets cannot be cut on video frames; with a PcmStore
+    as ``pcm`` it is read from there instead. The video work grows with the
+    number of cuts, not with the length of the recording.
+    """
+    if mode not in ('keyframe', 'smart'):
+        raise ValueError(f"Unknown stream copy mode: {mode!r}")
+    frame_rate = probe_video_rate(input_video)
+    if frame_rate is None:
+        raise ValueError(f"{input_video} has no video stream.")
+    codec = probe_codec(input_video)
+    if mode == 'smart' and codec not in SMART_ENCODERS:
+        raise ValueError(f"Smart rendering cannot re-encode {codec} video; use the 'keyframe' or "
+                         f"'sequential' mode instead.")
+    num, den = frame_rate
+    frames = snap_to_frames(sections, frame_rate)
+    if not frames:
+        raise ValueError("No non-silent sections were detected.")
+    sections = [(start * den / num, end * den / num) for start, end in frames]
+
+    keyframes = probe_keyframes(input_video)
+    duration = None
+    if mode == 'keyframe':
+        duration = probe_duration(input_video)
+        sections = snap_to_keyframes(sections, keyframes, duration)
+        frames = snap_to_frames(sections, frame_rate)
+        pieces = [('copy', start, end) for start, end in sections]
+    else:
+        pieces = smart_pieces(sections, keyframes)
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        list_path = os.path.join(tmp, 'concat.txt')
+        entries = []
+        for i, (kind, start, end) in enumerate(pieces):
+            piece = os.path.join(tmp, f'piece{i:06d}.mp4')
+            if kind == 'encode':
+                codec_args = ['-c:v', SMART_ENCODERS[codec], '-preset', preset, '-crf', str(crf), '-pix_fmt', 'yuv420p']
+            else:
+                codec_args = ['-c', 'copy', '-avoid_negative_ts', 'make_zero']
+            # The last GOP of the file has no keyframe after it to count up to
+            frame_count = None if end == duration else round((end - start) * num / den)
+            _cut_piece(input_video, piece, start, frame_count, codec_args)
+            entries.append((piece, None, None))
+        write_concat_list(list_path, entries)
+        if any(kind == 'Audio' for _, kind in probe_streams(input_video)):
+            _mux_kept_audio(input_video, list_path, frames, frame_rate, output_video, pcm)
+        else:
+            run_ffmpeg('-v', 'error', '-f', 'concat', '-safe', '0', '-i', list_path,
+                       '-map', '0:v:0', '-c', 'copy', '-movflags', '+faststart', output_video)
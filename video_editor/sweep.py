@@ -0,0 +1,44 @@
+from .intervals import voiced_frames
+from .timecode import DEFAULT_PROFILE, frames_to_seconds, profile_frame_rate, samples_to_frames
+
+
+def sweep(envelope, thresholds, chunk_sizes=None, merge_thresholds=(0.0,), profile=DEFAULT_PROFILE):
+    """Evaluate every (threshold, chunk_size, merge_threshold) combination.
+
+    ``envelope`` must have been computed with a window that divides every
+    chunk size. Thresholds may include detection.AUTO_THRESHOLDS names.
+    Yields one result dict per combination with the kept duration, the
+    number of cuts and the shortest voiced segment, plus the voiced sections
+    as frame ranges of the MLT profile and in seconds.
+    """
+    frame_rate = profile_frame_rate(profile)
+    length = samples_to_frames(envelope.nsamples, envelope.analysis_fps, frame_rate)
+    for chunk_size in chunk_sizes or [envelope.chunk_size]:
+        rebinned = envelope.rebin(chunk_size)
+        for threshold in thresholds:
+            # Threshold methods are resolved against the levels at this chunk size
+            method = threshold if isinstance(threshold, str) else None
+            if method:
+                threshold = rebinned.auto_threshold(method)
+            silent_starts, silent_ends = rebinned.silent_sample_runs(threshold)
+            for merge_threshold in merge_thresholds:
+                voiced = voiced_frames(silent_starts, silent_ends, envelope.nsamples,
+                                       envelope.analysis_fps, frame_rate, merge_threshold)
+                lengths = frames_to_seconds(voiced.lengths, frame_rate)
+                yield {
+                    'threshold': threshold,
+                    'threshold_method': method,
+                    'chunk_size': chunk_size,
+                    'merge_threshold': merge_threshold,
+                    'kept_duration': float(lengths.sum()),
+                    'cut_count': len(voiced.complement(length)),
+                    'segment_count': len(lengths),
+                    'shortest_segment': float(lengths.min()) if len(lengths) else 0.0,
+                    'voiced_frames': list(voiced),
+                    'voiced_sections': voiced.to_seconds(frame_rate),
+                }
+
+
+def mlt_filename(result):
+    return (f"threshold_{result['threshold_method'] or result['threshold']}_chunk_size_{result['chunk_size']}"
+            f"_merge_{result['merge_threshold']}.mlt")
@@ -0,0 +1,65 @@
+import numpy as np
+
+# frame_rate_num / frame_rate_den of the MLT profiles projects can be written for
+PROFILE_FRAME_RATES = {
+    'hdv_720_25p': (25, 1),
+    'hdv_720_30p': (30000, 1001),
+    'hdv_720_50p': (50, 1),
+    'hdv_720_60p': (60000, 1001),
+    'atsc_1080p_2398': (24000, 1001),
+    'atsc_1080p_24': (24, 1),
+    'atsc_1080p_25': (25, 1),
+    'atsc_1080p_2997': (30000, 1001),
+    'atsc_1080p_30': (30, 1),
+    'atsc_1080p_50': (50, 1),
+    'atsc_1080p_5994': (60000, 1001),
+    'atsc_1080p_60': (60, 1),
+}
+DEFAULT_PROFILE = 'hdv_720_25p'
+
+
+def profile_frame_rate(profile=DEFAULT_PROFILE):
+    """Return (frame_rate_num, frame_rate_den) of a named MLT profile."""
+    try:
+        return PROFILE_FRAME_RATES[profile]
+    except KeyError:
+        raise ValueError(f"Unknown MLT profile: {profile!r}") from None
+
+
+def samples_to_frames(samples, sample_rate, frame_rate):
+    """Round sample positions to the nearest frame boundary, in integer arithmetic."""
+    num, den = frame_rate
+    samples = np.asarray(samples, dtype=np.int64)
+    return (2 * samples * num + sample_rate * den) // (2 * sample_rate * den)
+
+
+def frames_to_seconds(frames, frame_rate):
+    num, den = frame_rate
+    return np.asarray(frames, dtype=np.int64) * den / num
+
+
+_MILLISECONDS = [f".{ms:03d}" for ms in range(1000)]
+
+
+def _format_milliseconds(milliseconds):
+    # Format each distinct whole second once and append the millisecond suffix
+    seconds, milliseconds = np.divmod(milliseconds, 1000)
+    unique, index = np.unique(seconds, return_inverse=True)
+    clock = [f"{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}" for s in unique.tolist()]
+    return [clock[i] + _MILLISECONDS[ms] for i, ms in zip(index.tolist(), milliseconds.tolist())]
+
+
+def frames_to_timecodes(frames, frame_rate):
+    """Convert an array of frame numbers to 'hh:mm:ss.SSS' clock strings.
+
+    Milliseconds are rounded to nearest, so MLT maps every string back to
+    the same frame at any profile rate below 1000 fps.
+    """
+    num, den = frame_rate
+    frames = np.asarray(frames, dtype=np.int64)
+    return _format_milliseconds((2000 * den * frames + num) // (2 * num))
+
+
+def seconds_to_timecode(seconds):
+    """Convert seconds to 'hh:mm:ss.SSS' format."""
+    return _format_milliseconds(np.array([round(seconds * 1000)], dtype=np.int64))[0]